@@ -1,10 +1,148 @@
+import io
 import os
 import datetime
 import json
+import atexit
+import functools
+import mimetypes
+import logging
+import threading
+import concurrent.futures
+import httplib2
+import google_auth_httplib2
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from retry import retry
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+# A child of the scraper's console logger, so upload failures show up in the run output
+logger = logging.getLogger("talabat.drive")
+
+# Define the scopes required for Google Drive access
+SCOPES = ['https://www.googleapis.com/auth/drive']
+# Files above this size (5 MB) use a resumable upload session, smaller ones a single request
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+# Drive search query for a date folder inside a parent folder
+_QUERY_TMPL = "name='{name}' and mimeType='application/vnd.google-apps.folder' and '{parent}' in parents and trashed=false"
+
+
+# Shared by every uploader so worker threads (and their Drive connections) survive between uploads
+_UPLOAD_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="drive-upload")
+atexit.register(_UPLOAD_EXECUTOR.shutdown, wait=True)
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+# Upper bound in seconds on how long a Retry-After header may hold a worker
+MAX_RETRY_AFTER = 60
+
+
+def _is_auth_error(exception):
+    """An expired or rejected token; worth one more try on a freshly authenticated service"""
+    return isinstance(exception, HttpError) and exception.resp.status == 401
+
+
+def _is_retryable(exception):
+    """Only dropped connections, auth, rate limit and server errors are retried; quota, permission and not-found errors fail fast"""
+    if isinstance(exception, (ConnectionError, TimeoutError)):
+        return True
+    return isinstance(exception, HttpError) and (
+        exception.resp.status in RETRYABLE_STATUSES or _is_auth_error(exception))
+
+
+# Jittered exponential backoff keeps parallel upload threads from retrying in lockstep
+_backoff = wait_exponential_jitter(initial=1, max=16)
+
+
+def _wait_for_retry(retry_state):
+    """Back off exponentially, but never retry sooner than a server-provided Retry-After"""
+    delay = _backoff(retry_state)
+    exception = retry_state.outcome.exception()
+    if isinstance(exception, HttpError):
+        retry_after = exception.resp.get('retry-after', '')
+        if retry_after.isdigit():
+            delay = max(delay, min(int(retry_after), MAX_RETRY_AFTER))
+    return delay
+
+
+def _log_retry(retry_state):
+    """Log which call is being retried, with its file/folder arguments, and for how long it waits"""
+    logger.warning(
+        "Retrying %s%s in %.1fs (attempt %s): %s",
+        retry_state.fn.__name__, retry_state.args[1:], retry_state.next_action.sleep,
+        retry_state.attempt_number, retry_state.outcome.exception())
+
+
+def _give_up(retry_state):
+    """Report the final error and return None, matching the methods' failure contract"""
+    logger.error("Giving up after %s attempts: %s", retry_state.attempt_number, retry_state.outcome.exception())
+    return None
+
+
+drive_retry = retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=_wait_for_retry,
+    stop=stop_after_attempt(5),
+    before_sleep=_log_retry,
+    retry_error_callback=_give_up
+)
+
+
+# The stdlib table only knows Office formats when the host's mime.types lists them
+DEFAULT_MIME_TYPE = 'application/octet-stream'
+_EXTRA_MIME_TYPES = {
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.csv': 'text/csv',
+    '.json': 'application/json',
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _mime_for(ext):
+    """Look up the MIME type for a file extension such as '.xlsx'"""
+    ext = ext.lower()
+    return mimetypes.types_map.get(ext) or _EXTRA_MIME_TYPES.get(ext, DEFAULT_MIME_TYPE)
+
+
+def _checked_file_size(file_path):
+    """
+    Stat a file before uploading it
+
+    Returns:
+        int: File size in bytes, None if the file is missing or empty
+    """
+    try:
+        file_size = os.stat(file_path).st_size
+    except FileNotFoundError:
+        logger.error("File not found, skipping upload: %s", file_path)
+        return None
+    if file_size == 0:
+        logger.warning("File is empty, skipping upload: %s", file_path)
+        return None
+    return file_size
+
+
+def _split_extension(file_name):
+    """Split a file name into stem and extension ('.xlsx'), without os.path overhead"""
+    dot = file_name.rfind('.')
+    return (file_name[:dot], file_name[dot:]) if dot > 0 else (file_name, '')
+
+
+def _unique_file_name(file_name, timestamp):
+    """Insert the timestamp before the extension so repeated uploads never overwrite each other"""
+    stem, ext = _split_extension(file_name)
+    return f"{stem}_{timestamp}{ext}"
+
+
+def _escape_query_value(value):
+    """Escape a value for use inside a single-quoted Drive query string"""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _date_folder_query(today_date, parent_folder_id):
+    """Build the Drive query that finds the date folder inside a parent folder"""
+    return _QUERY_TMPL.format(name=_escape_query_value(today_date), parent=_escape_query_value(parent_folder_id))
+
 
 class SavingOnDrive:
     """Class to handle uploading files to Google Drive with date-based folders"""
@@ -17,13 +155,49 @@ class SavingOnDrive:
             credentials_json: JSON string containing service account credentials
         """
         self.credentials_json = credentials_json
+        self.credentials = self._load_credentials(credentials_json)
         self.drive_service = None
+        # Per-thread Drive services; httplib2 connections must not be shared between threads
+        self._thread_local = threading.local()
+        self._auth_lock = threading.Lock()
+        self._folder_lock = threading.Lock()
+        # Date folder IDs already resolved in this process, keyed by (parent_folder_id, date)
+        self._date_folder_cache = {}
         # The folder IDs for the two target locations
         self.target_folders = [
             "15ED49IXFpuL0zzGTHfG7IsPYQLnWJAhg",  # First folder
             "18PiXcppJh7e2RJ2kcw6Mb8-kYiCHPAe2"   # Second folder
         ]
     
+    @staticmethod
+    def _load_credentials(credentials_json):
+        """
+        Parse the service account JSON once and build the Credentials object
+
+        Args:
+            credentials_json: JSON string containing service account credentials
+
+        Returns:
+            Credentials: Service account credentials, None if missing or invalid
+        """
+        if not credentials_json:
+            return None
+        # Parse JSON credentials
+        try:
+            credentials_dict = json.loads(credentials_json)
+        except json.JSONDecodeError as e:
+            logger.error("Invalid JSON in credentials: %s", e)
+            return None
+        if not credentials_dict.get('type') == 'service_account':
+            logger.error("Provided credentials are not a valid service account key")
+            return None
+        try:
+            # Load credentials from JSON dictionary
+            return Credentials.from_service_account_info(credentials_dict, scopes=SCOPES)
+        except Exception as e:
+            logger.exception("Error loading service account credentials")
+            return None
+
     def authenticate(self):
         """
         Authenticate with Google Drive API using service account credentials
@@ -31,60 +205,91 @@ class SavingOnDrive:
         Returns:
             bool: True if authentication successful, False otherwise
         """
-        try:
-            if not self.credentials_json:
-                print("Error: No credentials provided. Ensure TALABAT_GCLOUD_KEY_JSON is set.")
-                return False
-            # Parse JSON credentials
+        if self.drive_service:
+            return True
+        # Upload threads may race here on first use; only one of them builds the service
+        with self._auth_lock:
+            if self.drive_service:
+                return True
             try:
-                credentials_dict = json.loads(self.credentials_json)
-                if not credentials_dict.get('type') == 'service_account':
-                    print("Error: Provided credentials are not a valid service account key")
+                if not self.credentials_json:
+                    logger.error("No credentials provided. Ensure TALABAT_GCLOUD_KEY_JSON is set.")
+                    return False
+                if not self.credentials:
                     return False
-            except json.JSONDecodeError as e:
-                print(f"Error: Invalid JSON in credentials: {str(e)}")
+                # Build the Drive API service
+                self.drive_service = self._build_service()
+                self._thread_local.service = self.drive_service
+                logger.info("Successfully authenticated with Google Drive")
+                return True
+            except Exception as e:
+                logger.exception("Authentication error")
                 return False
-            # Define the scopes required for Google Drive access
-            SCOPES = ['https://www.googleapis.com/auth/drive']
-            # Load credentials from JSON dictionary
-            credentials = Credentials.from_service_account_info(
-                credentials_dict, scopes=SCOPES)
-            # Build the Drive API service
-            self.drive_service = build('drive', 'v3', credentials=credentials)
-            print("Successfully authenticated with Google Drive")
-            return True
-        except Exception as e:
-            print(f"Authentication error: {str(e)}")
-            return False
     
-    @retry(tries=3, delay=2, backoff=2)
-    def create_date_folder(self, parent_folder_id):
+    def _build_service(self):
+        """
+        Build a Drive API service on its own persistent HTTP connection
+
+        The credentials object is shared so the access token is fetched once,
+        while each service keeps its own keep-alive connection for reuse.
+
+        Returns:
+            Resource: Drive v3 service
+        """
+        http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+        return build('drive', 'v3', http=http, cache_discovery=False)
+
+    def _get_service(self):
+        """
+        Get the Drive API service for the calling thread, building it on first use
+
+        Returns:
+            Resource: Drive v3 service owned by the current thread
+        """
+        service = getattr(self._thread_local, 'service', None)
+        if service is None:
+            if not self.authenticate():
+                raise RuntimeError("Not authenticated with Google Drive")
+            service = self._build_service()
+            self._thread_local.service = service
+        return service
+
+    def _reset_service(self):
+        """Forget the calling thread's Drive service so the next call re-authenticates"""
+        if getattr(self._thread_local, 'service', None) is self.drive_service:
+            self.drive_service = None
+        self._thread_local.service = None
+
+    @drive_retry
+    def create_date_folder(self, parent_folder_id, today_date=None):
         """
         Create a folder with today's date in the specified parent folder
         
         Args:
             parent_folder_id: ID of the parent folder
+            today_date: Optional folder name in YYYY-MM-DD format (default: today)
             
         Returns:
             str: Folder ID of the created date folder, None if failed
         """
         try:
-            if not self.drive_service:
-                if not self.authenticate():
-                    return None
             # Get today's date in YYYY-MM-DD format
-            today_date = datetime.datetime.now().strftime("%Y-%m-%d")
+            today_date = today_date or datetime.date.today().isoformat()
+            cache_key = (parent_folder_id, today_date)
+            if cache_key in self._date_folder_cache:
+                return self._date_folder_cache[cache_key]
             # Check if folder already exists
-            query = f"name='{today_date}' and mimeType='application/vnd.google-apps.folder' and '{parent_folder_id}' in parents and trashed=false"
-            results = self.drive_service.files().list(
+            query = _date_folder_query(today_date, parent_folder_id)
+            results = self._get_service().files().list(
                 q=query,
                 spaces='drive',
-                fields='files(id, name)'
+                fields='files(id)'
             ).execute()
             existing_folders = results.get('files', [])
             # If folder already exists, return its ID
             if existing_folders:
-                print(f"Folder {today_date} already exists in parent folder {parent_folder_id}")
+                logger.info("Folder %s already exists in parent folder %s", today_date, parent_folder_id)
+                self._date_folder_cache[cache_key] = existing_folders[0]['id']
                 return existing_folders[0]['id']
             # Create new folder
             folder_metadata = {
@@ -92,19 +297,27 @@ class SavingOnDrive:
                 'mimeType': 'application/vnd.google-apps.folder',
                 'parents': [parent_folder_id]
             }
-            folder = self.drive_service.files().create(
+            folder = self._get_service().files().create(
                 body=folder_metadata,
                 fields='id'
             ).execute()
             folder_id = folder.get('id')
-            print(f"Created folder {today_date} with ID: {folder_id} in parent folder {parent_folder_id}")
+            logger.info("Created folder %s with ID: %s in parent folder %s", today_date, folder_id, parent_folder_id)
+            if folder_id:
+                self._date_folder_cache[cache_key] = folder_id
             return folder_id
         except Exception as e:
-            print(f"Error creating date folder: {str(e)}")
+            if _is_auth_error(e):
+                # Drop this thread's service so the retry rebuilds its connection and token
+                self._reset_service()
+                raise
+            if _is_retryable(e):
+                raise
+            logger.exception("Error creating date folder")
             return None
     
-    @retry(tries=3, delay=2, backoff=2)
-    def upload_file(self, file_path, folder_id, file_name=None):
+    @drive_retry
+    def upload_file(self, file_path, folder_id, file_name=None, timestamp=None):
         """
         Upload a file to a specific Google Drive folder
         
@@ -112,42 +325,59 @@ class SavingOnDrive:
             file_path: Path to the file to upload
             folder_id: ID of the folder to upload to
             file_name: Optional name to use for the file in Drive (default: original filename)
+            timestamp: Optional suffix in YYYYMMDD_HHMMSS format (default: now)
             
         Returns:
             str: File ID if upload successful, None otherwise
         """
+        # Missing or empty files fail here instead of after a round trip to Drive
+        file_size = _checked_file_size(file_path)
+        if not file_size:
+            return None
         try:
-            if not self.drive_service:
-                if not self.authenticate():
-                    return None
             # Get the base file name if not provided
             if file_name is None:
                 file_name = os.path.basename(file_path)
             # Add timestamp to ensure uniqueness and prevent overwriting
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            name_parts = os.path.splitext(file_name)
-            unique_file_name = f"{name_parts[0]}_{timestamp}{name_parts[1]}"
+            timestamp = timestamp or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            unique_file_name = _unique_file_name(file_name, timestamp)
+            ext = _split_extension(file_name)[1]
             # Define file metadata
             file_metadata = {
                 'name': unique_file_name,
                 'parents': [folder_id]
             }
-            # Create media object for the file
-            media = MediaFileUpload(
-                file_path,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                resumable=True
-            )
+            # Create media object for the file; resumable sessions only pay off for large files
+            mimetype = _mime_for(ext) if ext else DEFAULT_MIME_TYPE
+            if file_size > RESUMABLE_THRESHOLD:
+                media = MediaFileUpload(
+                    file_path,
+                    mimetype=mimetype,
+                    resumable=True,
+                    chunksize=RESUMABLE_THRESHOLD
+                )
+            else:
+                # Small files are read in one go and sent as a single request body
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                # A fresh buffer per upload, so concurrent uploads never share a read position
+                media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mimetype, resumable=False, chunksize=-1)
             # Execute the upload
-            file = self.drive_service.files().create(
+            file = self._get_service().files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id'
             ).execute()
-            print(f"File uploaded successfully to folder {folder_id}")
+            logger.info("File uploaded successfully to folder %s", folder_id)
             return file.get('id')
         except Exception as e:
-            print(f"Upload error: {str(e)}")
+            if _is_auth_error(e):
+                # Drop this thread's service so the retry rebuilds its connection and token
+                self._reset_service()
+                raise
+            if _is_retryable(e):
+                raise
+            logger.exception("Upload error")
             return None
     
     def upload_to_multiple_folders(self, file_path, file_name=None):
@@ -161,201 +391,144 @@ class SavingOnDrive:
         Returns:
             list: List of file IDs for each successful upload
         """
-        if not self.drive_service and not self.authenticate():
-            print("Failed to authenticate with Google Drive")
+        if not self.authenticate():
+            logger.error("Failed to authenticate with Google Drive")
             return []
+        # Format once so every folder gets the same date and file name even across midnight
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        today_date = datetime.date.today().isoformat()
+        date_folders = self._find_or_create_date_folders(self.target_folders, today_date)
+        unique_file_name = _unique_file_name(file_name or os.path.basename(file_path), timestamp)
         file_ids = []
+        source_file_id = None
+        copy_targets = []
         for parent_folder_id in self.target_folders:
-            date_folder_id = self.create_date_folder(parent_folder_id)
-            if date_folder_id:
-                file_id = self.upload_file(file_path, date_folder_id, file_name)
-                if file_id:
-                    file_ids.append(file_id)
-            else:
-                print(f"Failed to create/find date folder in parent folder {parent_folder_id}")
+            date_folder_id = date_folders.get(parent_folder_id)
+            if not date_folder_id:
+                logger.error("Failed to create/find date folder in parent folder %s", parent_folder_id)
+                continue
+            if source_file_id:
+                copy_targets.append(date_folder_id)
+                continue
+            # The bytes are sent once; the other folders get a server-side copy
+            source_file_id = self.upload_file(file_path, date_folder_id, file_name, timestamp)
+            if source_file_id:
+                file_ids.append(source_file_id)
+        if not source_file_id:
+            return file_ids
+        futures = [
+            _UPLOAD_EXECUTOR.submit(self.copy_file, source_file_id, date_folder_id, unique_file_name)
+            for date_folder_id in copy_targets
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            file_id = future.result()
+            if file_id:
+                file_ids.append(file_id)
         return file_ids
 
-
-
-
-# import os
-# import datetime
-# from google.oauth2.service_account import Credentials
-# from googleapiclient.discovery import build
-# from googleapiclient.http import MediaFileUpload
-
-
-# class SavingOnDrive:
-#     """Class to handle uploading files to Google Drive with date-based folders"""
-    
-#     def __init__(self, credentials_path='credentials.json'):
-#         """
-#         Initialize the DriveUploader with Google Drive API credentials.
-        
-#         Args:
-#             credentials_path: Path to the service account credentials JSON file
-#         """
-#         self.credentials_path = credentials_path
-#         self.drive_service = None
-        
-#         # The folder IDs for the two target locations
-#         self.target_folders = [
-#             "15ED49IXFpuL0zzGTHfG7IsPYQLnWJAhg",  # First folder
-#             "18PiXcppJh7e2RJ2kcw6Mb8-kYiCHPAe2"   # Second folder
-#         ]
-    
-#     def authenticate(self):
-#         """
-#         Authenticate with Google Drive API using service account credentials
-        
-#         Returns:
-#             bool: True if authentication successful, False otherwise
-#         """
-#         try:
-#             # Define the scopes required for Google Drive access
-#             SCOPES = ['https://www.googleapis.com/auth/drive']
-            
-#             # Load credentials from the service account file
-#             credentials = Credentials.from_service_account_file(
-#                 self.credentials_path, scopes=SCOPES)
-            
-#             # Build the Drive API service
-#             self.drive_service = build('drive', 'v3', credentials=credentials)
-#             return True
-            
-#         except Exception as e:
-#             print(f"Authentication error: {str(e)}")
-#             return False
-    
-#     def create_date_folder(self, parent_folder_id):
-#         """
-#         Create a folder with today's date in the specified parent folder
-        
-#         Args:
-#             parent_folder_id: ID of the parent folder
-            
-#         Returns:
-#             str: Folder ID of the created date folder, None if failed
-#         """
-#         try:
-#             # Get today's date in YYYY-MM-DD format
-#             today_date = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-#             # Check if folder already exists
-#             query = f"name='{today_date}' and mimeType='application/vnd.google-apps.folder' and '{parent_folder_id}' in parents and trashed=false"
-#             results = self.drive_service.files().list(
-#                 q=query,
-#                 spaces='drive',
-#                 fields='files(id, name)'
-#             ).execute()
-            
-#             existing_folders = results.get('files', [])
-            
-#             # If folder already exists, return its ID
-#             if existing_folders:
-#                 print(f"Folder {today_date} already exists in parent folder {parent_folder_id}")
-#                 return existing_folders[0]['id']
-            
-#             # Create new folder
-#             folder_metadata = {
-#                 'name': today_date,
-#                 'mimeType': 'application/vnd.google-apps.folder',
-#                 'parents': [parent_folder_id]
-#             }
-            
-#             folder = self.drive_service.files().create(
-#                 body=folder_metadata,
-#                 fields='id'
-#             ).execute()
-            
-#             folder_id = folder.get('id')
-#             print(f"Created folder {today_date} with ID: {folder_id} in parent folder {parent_folder_id}")
-#             return folder_id
-            
-#         except Exception as e:
-#             print(f"Error creating date folder: {str(e)}")
-#             return None
-    
-#     def upload_file(self, file_path, folder_id, file_name=None):
-#         """
-#         Upload a file to a specific Google Drive folder
-        
-#         Args:
-#             file_path: Path to the file to upload
-#             folder_id: ID of the folder to upload to
-#             file_name: Optional name to use for the file in Drive (default: original filename)
-            
-#         Returns:
-#             str: File ID if upload successful, None otherwise
-#         """
-#         try:
-#             if not self.drive_service:
-#                 if not self.authenticate():
-#                     return None
-            
-#             # Get the base file name if not provided
-#             if file_name is None:
-#                 file_name = os.path.basename(file_path)
-            
-#             # Add timestamp to ensure uniqueness and prevent overwriting
-#             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-#             name_parts = os.path.splitext(file_name)
-#             unique_file_name = f"{name_parts[0]}_{timestamp}{name_parts[1]}"
-            
-#             # Define file metadata
-#             file_metadata = {
-#                 'name': unique_file_name,
-#                 'parents': [folder_id]
-#             }
-            
-#             # Create media object for the file
-#             media = MediaFileUpload(
-#                 file_path,
-#                 mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-#                 resumable=True
-#             )
-            
-#             # Execute the upload
-#             file = self.drive_service.files().create(
-#                 body=file_metadata,
-#                 media_body=media,
-#                 fields='id'
-#             ).execute()
-            
-#             print(f"File uploaded successfully to folder {folder_id}")
-#             return file.get('id')
-            
-#         except Exception as e:
-#             print(f"Upload error: {str(e)}")
-#             return None
-    
-#     def upload_to_multiple_folders(self, file_path, file_name=None):
-#         """
-#         Upload a file to date-based folders within multiple parent folders
+    @drive_retry
+    def copy_file(self, file_id, folder_id, file_name):
+        """
+        Copy an already uploaded file into another Google Drive folder
         
-#         Args:
-#             file_path: Path to the file to upload
-#             file_name: Optional name to use for the file in Drive
+        Args:
+            file_id: ID of the file to copy
+            folder_id: ID of the destination folder
+            file_name: Name to give the copy
             
-#         Returns:
-#             list: List of file IDs for each successful upload
-#         """
-#         if not self.authenticate():
-#             print("Failed to authenticate with Google Drive")
-#             return []
-        
-#         file_ids = []
+        Returns:
+            str: File ID of the copy if successful, None otherwise
+        """
+        try:
+            file = self._get_service().files().copy(
+                fileId=file_id,
+                body={'name': file_name, 'parents': [folder_id]},
+                fields='id'
+            ).execute()
+            logger.info("File copied successfully to folder %s", folder_id)
+            return file.get('id')
+        except Exception as e:
+            if _is_auth_error(e):
+                # Drop this thread's service so the retry rebuilds its connection and token
+                self._reset_service()
+                raise
+            if _is_retryable(e):
+                raise
+            logger.exception("Copy error")
+            return None
+
+    def _find_or_create_date_folders(self, parent_folder_ids, today_date=None):
+        """
+        Find or create today's date folder in several parent folders using batched requests
         
-#         for parent_folder_id in self.target_folders:
-#             # Create or get date folder
-#             date_folder_id = self.create_date_folder(parent_folder_id)
+        Args:
+            parent_folder_ids: IDs of the parent folders
+            today_date: Optional folder name in YYYY-MM-DD format (default: today)
             
-#             if date_folder_id:
-#                 # Upload file to the date folder
-#                 file_id = self.upload_file(file_path, date_folder_id, file_name)
-#                 if file_id:
-#                     file_ids.append(file_id)
-#             else:
-#                 print(f"Failed to create/find date folder in parent folder {parent_folder_id}")
-        
-#         return file_ids
+        Returns:
+            dict: Mapping of parent folder ID to date folder ID (None if failed)
+        """
+        today_date = today_date or datetime.date.today().isoformat()
+        date_folders = {
+            parent_folder_id: self._date_folder_cache.get((parent_folder_id, today_date))
+            for parent_folder_id in parent_folder_ids
+        }
+        unresolved = [parent_folder_id for parent_folder_id, folder_id in date_folders.items() if not folder_id]
+        if not unresolved:
+            return date_folders
+
+        def on_list(request_id, response, exception):
+            if exception is not None:
+                logger.error("Error looking up date folder in parent folder %s: %s", request_id, exception)
+                return
+            existing_folders = response.get('files', [])
+            if existing_folders:
+                logger.info("Folder %s already exists in parent folder %s", today_date, request_id)
+                date_folders[request_id] = existing_folders[0]['id']
+
+        def on_create(request_id, response, exception):
+            if exception is not None:
+                logger.error("Error creating date folder in parent folder %s: %s", request_id, exception)
+                return
+            date_folders[request_id] = response.get('id')
+            logger.info("Created folder %s with ID: %s in parent folder %s", today_date, date_folders[request_id], request_id)
+
+        # Uploads running in parallel would otherwise each create the same folder
+        with self._folder_lock:
+            for parent_folder_id in unresolved:
+                date_folders[parent_folder_id] = self._date_folder_cache.get((parent_folder_id, today_date))
+            unresolved = [parent_folder_id for parent_folder_id, folder_id in date_folders.items() if not folder_id]
+            if not unresolved:
+                return date_folders
+            try:
+                service = self._get_service()
+                # One HTTP round trip checks every parent folder
+                batch = service.new_batch_http_request(callback=on_list)
+                for parent_folder_id in unresolved:
+                    query = _date_folder_query(today_date, parent_folder_id)
+                    batch.add(
+                        service.files().list(q=query, spaces='drive', fields='files(id)'),
+                        request_id=parent_folder_id
+                    )
+                batch.execute()
+                # Create the folders that are still missing in a second batch
+                missing = [parent_folder_id for parent_folder_id, folder_id in date_folders.items() if not folder_id]
+                if missing:
+                    batch = service.new_batch_http_request(callback=on_create)
+                    for parent_folder_id in missing:
+                        folder_metadata = {
+                            'name': today_date,
+                            'mimeType': 'application/vnd.google-apps.folder',
+                            'parents': [parent_folder_id]
+                        }
+                        batch.add(
+                            service.files().create(body=folder_metadata, fields='id'),
+                            request_id=parent_folder_id
+                        )
+                    batch.execute()
+            except Exception as e:
+                logger.exception("Error creating date folders")
+            for parent_folder_id, folder_id in date_folders.items():
+                if folder_id:
+                    self._date_folder_cache[(parent_folder_id, today_date)] = folder_id
+        return date_folders
@@ -0,0 +1,48 @@
+"""JSON encoding and file helpers shared by the scrapers, using orjson when it is installed."""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_json(data, indent: bool = True) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def write_bytes_atomic(filename: str, payload: bytes, fsync: bool = True):
+    """Write through a temporary file in the same directory so readers never see a partial file."""
+    temp_filename = None
+    try:
+        with tempfile.NamedTemporaryFile('wb', delete=False, dir=os.path.dirname(filename) or '.') as temp_file:
+            temp_file.write(payload)
+            temp_file.flush()
+            if fsync:
+                os.fsync(temp_file.fileno())
+            temp_filename = temp_file.name
+        os.replace(temp_filename, filename)
+    finally:
+        if temp_filename:
+            Path(temp_filename).unlink(missing_ok=True)
+
+
+def write_json_atomic(filename: str, data, fsync: bool = True):
+    write_bytes_atomic(filename, dumps_json(data), fsync)
+
+
+def loads_json(content):
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+def load_json(filename: str):
+    with open(filename, 'rb') as f:
+        return loads_json(f.read())
@@ -1,29 +1,202 @@
 import asyncio
-import json
+import copy
+import csv
+import hashlib
 import os
-import tempfile
+import shutil
 import sys
 import subprocess
-from retry import retry
+import time
+import traceback
 import re
-from typing import Dict, List, Tuple
-import pandas as pd
-from openpyxl import Workbook, load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.utils import get_column_letter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import msgpack
+import xlsxwriter
 from playwright.async_api import async_playwright
+import playwright_patches
+from json_utils import dumps_json, load_json, write_bytes_atomic, write_json_atomic
 from talabat_main_scraper import TalabatScraper
 from SavingOnDrive import SavingOnDrive
 from time import sleep
 from datetime import datetime
 import logging
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 logging.basicConfig(
     filename='scraper.log',
     level=logging.INFO,  # Changed from DEBUG to INFO
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Console status goes through its own handler so it stays out of scraper.log
+logger = logging.getLogger("talabat")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(logging.Formatter('%(message)s'))
+logger.addHandler(_console_handler)
+
+
+def env_int(name: str, default: int, minimum: int = 1) -> int:
+    """Read an integer setting from the environment, using `default` when it is unset or not a number"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return max(int(value), minimum)
+    except ValueError:
+        logger.info(f"Ignoring {name}={value!r}, using {default}")
+        return default
+
+# constant_memory flushes each row to disk as soon as the next one starts
+XLSX_OPTIONS = {'constant_memory': True, 'strings_to_numbers': False}
+# Column order of the simplified Excel sheets
+SIMPLIFIED_HEADERS = (
+    "Name", "Cuisine", "Rating", "Delivery Time", "Delivery Fee", "Min Order", "URL",
+    "Address", "Working Hours", "Rating Value", "Ratings Count", "Reviews Count",
+    "Menu Categories", "Menu Items"
+)
+
+# Listings whose cuisine contains any of these are stores rather than restaurants
+SKIP_CATEGORIES = ("Grocery, Convenience Store", "Pharmacy", "Flowers", "Electronics", "Grocery, Hypermarket")
+SKIP_CATEGORIES_RE = re.compile("|".join(map(re.escape, SKIP_CATEGORIES)))
+# Full progress dumps in scraper.log are only worth their cost when debugging
+DEBUG_DUMPS = bool(os.environ.get('TALABAT_DEBUG'))
+# Minimum seconds between progress writes; checkpoints before commits always write
+PROGRESS_SAVE_INTERVAL = 2.0
+# Progress files are rewritten often and committed to git; TALABAT_FSYNC=1 also fsyncs each write
+FSYNC_PROGRESS = bool(os.environ.get('TALABAT_FSYNC'))
+# Seconds to wait for a cold `playwright install` before carrying on without it
+PLAYWRIGHT_INSTALL_TIMEOUT = 300
+# Restaurants of one listing page scraped at the same time; each one runs its own browsers
+MAX_CONCURRENT_RESTAURANTS = env_int('TALABAT_CONCURRENCY', 4)
+# Listing pages of one area fetched ahead at the same time, counting the page being processed
+LISTING_PREFETCH_PAGES = 3
+# Listing pages share the Chromium browser of the info pages; TALABAT_LISTING_ENGINE=firefox gives them their own
+LISTING_ENGINE = os.environ.get('TALABAT_LISTING_ENGINE', 'chromium')
+PLAYWRIGHT_ENGINES = tuple(dict.fromkeys(("chromium", LISTING_ENGINE)))
+# Listing pages only need the DOM; stylesheets stay because the scroll-to-load loop depends on layout
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+BLOCKED_HOSTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net",
+                 "facebook.com", "hotjar.com", "branch.io", "appsflyer.com", "newrelic.com", "nr-data.net")
+# Restaurants delivering to several areas reuse details scraped this recently; TALABAT_FORCE_RESCRAPE=1 ignores them
+DETAILS_CACHE_TTL = float(os.environ.get('TALABAT_DETAILS_CACHE_HOURS', 24)) * 3600
+FORCE_RESCRAPE = bool(os.environ.get('TALABAT_FORCE_RESCRAPE'))
+# Progress is committed and pushed once per area; TALABAT_COMMIT_FREQUENCY=page also commits while an area runs
+COMMIT_FREQUENCY = os.environ.get('TALABAT_COMMIT_FREQUENCY', 'area')
+# Write an intermediate combined workbook after every this many completed areas
+SNAPSHOT_EVERY = 5
+# Areas of the Ahmadi governorate, scraped in this order
+AHMADI_AREAS = (
+    ("الظهر", "https://www.talabat.com/kuwait/restaurants/59/dhaher"),
+    ("الرقه", "https://www.talabat.com/kuwait/restaurants/37/riqqa"),
+    ("هدية", "https://www.talabat.com/kuwait/restaurants/30/hadiya"),
+    ("المنقف", "https://www.talabat.com/kuwait/restaurants/32/mangaf"),
+    ("أبو حليفة", "https://www.talabat.com/kuwait/restaurants/2/abu-halifa"),
+    ("الفنطاس", "https://www.talabat.com/kuwait/restaurants/38/fintas"),
+    ("العقيلة", "https://www.talabat.com/kuwait/restaurants/79/egaila"),
+    ("الصباحية", "https://www.talabat.com/kuwait/restaurants/31/sabahiya"),
+    ("الأحمدي", "https://www.talabat.com/kuwait/restaurants/3/al-ahmadi"),
+    ("الفحيحيل", "https://www.talabat.com/kuwait/restaurants/5/fahaheel"),
+    ("شرق الأحمدي", "https://www.talabat.com/kuwait/restaurants/3/al-ahmadi"),
+    ("ضاحية علي صباح السالم", "https://www.talabat.com/kuwait/restaurants/82/ali-sabah-al-salem-umm-al-hayman"),
+    ("ميناء عبد الله", "https://www.talabat.com/kuwait/restaurants/100/mina-abdullah"),
+    ("بنيدر", "https://www.talabat.com/kuwait/restaurants/6650/bnaider"),
+    ("الزور", "https://www.talabat.com/kuwait/restaurants/2053/zour"),
+    ("الجليعة", "https://www.talabat.com/kuwait/restaurants/6860/al-julaiaa"),
+    ("المهبولة", "https://www.talabat.com/kuwait/restaurants/24/mahboula"),
+    ("النويصيب", "https://www.talabat.com/kuwait/restaurants/2054/nuwaiseeb"),
+    ("الخيران", "https://www.talabat.com/kuwait/restaurants/2726/khairan"),
+    ("الوفرة", "https://www.talabat.com/kuwait/restaurants/2057/wafra-farms"),
+    ("ضاحية فهد الأحمد", "https://www.talabat.com/kuwait/restaurants/98/fahad-al-ahmed"),
+    ("ضاحية جابر العلي", "https://www.talabat.com/kuwait/restaurants/60/jaber-al-ali"),
+    ("مدينة صباح الأحمد السكنية", "https://www.talabat.com/kuwait/restaurants/6931/sabah-al-ahmad-2"),
+    ("مدينة صباح الأحمد البحرية", "https://www.talabat.com/kuwait/restaurants/2726/khairan"),
+    ("ميناء الأحمدي", "https://www.talabat.com/kuwait/restaurants/3/al-ahmadi")
+)
+
+# Canonical progress file schema; loaded files are merged over these so missing keys get defaults
+DEFAULT_CURRENT = {
+    "area_name": None,
+    "current_page": 0,
+    "total_pages": 0,
+    "current_restaurant": 0,
+    "total_restaurants": 0,
+    "processed_restaurants": [],
+    "completed_pages": []
+}
+DEFAULT_PROGRESS = {
+    "completed_areas": [],
+    "current_area_index": 0,
+    "last_updated": None,
+    "current_progress": DEFAULT_CURRENT
+}
+
+
+def merge_progress_defaults(progress: Dict = None) -> Dict:
+    """Return progress with any missing top-level or current_progress keys filled from the defaults.
+
+    Page and restaurant lists are deduplicated here, once per load; while scraping they only
+    grow through set-checked appends, so saves write them out as they are.
+    """
+    progress = progress or {}
+    merged = {**copy.deepcopy(DEFAULT_PROGRESS), **progress}
+    area_progress = {**copy.deepcopy(DEFAULT_CURRENT), **(progress.get("current_progress") or {})}
+    area_progress["completed_pages"] = sorted(set(
+        int(page) for page in area_progress["completed_pages"]
+        if isinstance(page, (int, float)) and page >= 1
+    ))
+    area_progress["processed_restaurants"] = list(dict.fromkeys(map(str, area_progress["processed_restaurants"])))
+    merged["current_progress"] = area_progress
+    return merged
+
+
+def simplified_row(restaurant: Dict) -> Tuple:
+    """Flatten one scraped restaurant into a simplified sheet row in SIMPLIFIED_HEADERS order"""
+    info = restaurant.get("info") or {}
+    reviews = restaurant.get("reviews") or {}
+    menu_items = restaurant.get("menu_items")
+    has_rating = bool(reviews.get("Rating_value"))
+    return (
+        restaurant.get("name", ""),
+        restaurant.get("cuisine", ""),
+        restaurant.get("rating", ""),
+        restaurant.get("delivery_time", ""),
+        restaurant.get("delivery_fee", ""),
+        restaurant.get("min_order", ""),
+        restaurant.get("url", ""),
+        info.get("Address", ""),
+        info.get("Working Hours", ""),
+        reviews["Rating_value"] if has_rating else "",
+        reviews.get("Ratings_count", "") if has_rating else "",
+        reviews.get("Reviews_count", "") if has_rating else "",
+        len(menu_items) if menu_items else "",
+        sum(map(len, menu_items.values())) if menu_items else "",
+    )
+
+
+async def block_unneeded_requests(route):
+    """Playwright route handler that aborts media and tracker requests and lets the rest through"""
+    request = route.request
+    host = urlsplit(request.url).hostname or ""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or host.endswith(BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def write_json_atomic_async(filename: str, data):
+    """Encode and write JSON in a worker thread so the event loop keeps running."""
+    await asyncio.to_thread(write_json_atomic, filename, data)
+
+
 class MainScraper:
     CURRENT_PROGRESS_FILE = "current_progress.json"
     SCRAPED_PROGRESS_FILE = "scraped_progress.json"
@@ -31,64 +204,100 @@ class MainScraper:
     def __init__(self):
         self.talabat_scraper = TalabatScraper()
         self.output_dir = "output"
+        self.cache_dir = os.path.join(self.output_dir, "cache")
+        # Kept outside output/ so the per-restaurant files are never committed
+        self.details_cache_dir = os.path.join(".cache", "restaurants")
         credentials_json = os.environ.get('TALABAT_GCLOUD_KEY_JSON')
         self.drive_uploader = SavingOnDrive(credentials_json=credentials_json)
         
         os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        os.makedirs(self.details_cache_dir, exist_ok=True)
         
+        self._progress_dirty = False
+        self._last_progress_save = 0.0
+        self._progress_write_lock = asyncio.Lock()
         self.current_progress = self.load_current_progress()
         self.scraped_progress = self.load_scraped_progress()
         
         self.github_token = os.environ.get('GITHUB_TOKEN')
         self.ensure_playwright_browsers()
+        
+        # Browsers are launched on first use and shared for the whole run
+        self._playwright = None
+        self._browsers = {}
+        self._browser_lock = asyncio.Lock()
+        self._listing_context = None
+        # Menu and review scrapes hold a Selenium driver for minutes; with their own threads they
+        # never fill the default executor that progress writes, git and uploads go through
+        self._selenium_executor = ThreadPoolExecutor(max_workers=2 * MAX_CONCURRENT_RESTAURANTS, thread_name_prefix="selenium")
+        
+        # Drive uploads run in worker threads while scraping continues; SavingOnDrive gives each thread its own client
+        self._upload_tasks = []
+
+    @staticmethod
+    def playwright_browsers_installed(browser_names=PLAYWRIGHT_ENGINES) -> bool:
+        """Check the Playwright cache for completed installs of the revisions this package expects"""
+        try:
+            import playwright
+            package_dir = os.path.join(os.path.dirname(playwright.__file__), "driver", "package")
+            browsers = load_json(os.path.join(package_dir, "browsers.json"))["browsers"]
+            revisions = {b["name"]: b["revision"] for b in browsers}
+            browsers_path = os.environ.get("PLAYWRIGHT_BROWSERS_PATH")
+            if browsers_path == "0":
+                browsers_path = os.path.join(package_dir, ".local-browsers")
+            elif not browsers_path:
+                if sys.platform == "win32":
+                    browsers_path = os.path.join(os.environ.get("LOCALAPPDATA", ""), "ms-playwright")
+                elif sys.platform == "darwin":
+                    browsers_path = os.path.expanduser("~/Library/Caches/ms-playwright")
+                else:
+                    browsers_path = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ms-playwright")
+            return all(
+                os.path.exists(os.path.join(browsers_path, f"{name}-{revisions[name]}", "INSTALLATION_COMPLETE"))
+                for name in browser_names
+            )
+        except Exception as e:
+            logging.warning(f"Could not check installed Playwright browsers: {e}")
+            return False
 
     def ensure_playwright_browsers(self):
+        if self.playwright_browsers_installed():
+            logger.info("Playwright browsers already installed")
+            return
         try:
-            print("Installing Playwright browsers...")
-            subprocess.run([sys.executable, "-m", "playwright", "install", "chromium", "firefox"], 
-                          check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            print("Playwright browsers installed successfully")
+            logger.info("Installing Playwright browsers...")
+            subprocess.run([sys.executable, "-m", "playwright", "install", *PLAYWRIGHT_ENGINES], 
+                          check=True, capture_output=True, text=True, timeout=PLAYWRIGHT_INSTALL_TIMEOUT)
+            logger.info("Playwright browsers installed successfully")
         except subprocess.CalledProcessError as e:
-            print(f"Error installing Playwright browsers: {e}")
-            logging.error(f"Error installing Playwright browsers: {e}")
+            logger.info(f"Error installing Playwright browsers: {e}")
+            logging.error(f"Error installing Playwright browsers: {e}\n{e.stderr}")
+        except subprocess.TimeoutExpired as e:
+            logger.info(f"Timed out installing Playwright browsers: {e}")
+            logging.error(f"Timed out installing Playwright browsers: {e}")
 
     def load_current_progress(self) -> Dict:
-        default_progress = {
-            "completed_areas": [],
-            "current_area_index": 0,
-            "last_updated": None,
-            "current_progress": {
-                "area_name": None,
-                "current_page": 0,
-                "total_pages": 0,
-                "current_restaurant": 0,
-                "total_restaurants": 0,
-                "processed_restaurants": [],
-                "completed_pages": []
-            }
-        }
+        default_progress = merge_progress_defaults()
         if not os.path.exists(self.CURRENT_PROGRESS_FILE):
-            print(f"No current progress file found, initializing {self.CURRENT_PROGRESS_FILE}")
+            logger.info(f"No current progress file found, initializing {self.CURRENT_PROGRESS_FILE}")
             self.save_current_progress(default_progress)
             return default_progress
         
         try:
-            with open(self.CURRENT_PROGRESS_FILE, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
-            if not isinstance(progress, dict) or "current_progress" not in progress:
-                print(f"Invalid current progress file, resetting to default")
+            progress = load_json(self.CURRENT_PROGRESS_FILE)
+            if not isinstance(progress, dict):
+                logger.info(f"Invalid current progress file, resetting to default")
                 logging.warning(f"Invalid current progress file structure")
                 self.save_current_progress(default_progress)
                 return default_progress
-            progress["current_progress"]["completed_pages"] = sorted(list(set(
-                int(page) for page in progress["current_progress"].get("completed_pages", [])
-                if isinstance(page, (int, float)) and page >= 1
-            )))
-            print(f"Loaded current progress from {self.CURRENT_PROGRESS_FILE}")
-            logging.info(f"Loaded current progress: {json.dumps(progress, ensure_ascii=False)}")
+            progress = merge_progress_defaults(progress)
+            logger.info(f"Loaded current progress from {self.CURRENT_PROGRESS_FILE}")
+            if DEBUG_DUMPS:
+                logging.info(f"Loaded current progress: {dumps_json(progress, indent=False).decode('utf-8')}")
             return progress
         except Exception as e:
-            print(f"Error loading current progress: {e}")
+            logger.info(f"Error loading current progress: {e}")
             logging.error(f"Error loading current progress: {e}")
             self.save_current_progress(default_progress)
             return default_progress
@@ -96,148 +305,192 @@ class MainScraper:
     def save_current_progress(self, progress: Dict = None):
         if progress is None:
             progress = self.current_progress
-        temp_filename = None
         try:
-            progress["last_updated"] = datetime.now().isoformat()
-            if "current_progress" in progress:
-                progress["current_progress"]["completed_pages"] = sorted(list(set(
-                    int(page) for page in progress["current_progress"].get("completed_pages", [])
-                    if isinstance(page, (int, float)) and page >= 1
-                )))
-            json.dumps(progress, ensure_ascii=False)
-            with tempfile.NamedTemporaryFile('w', delete=False, dir='.') as temp_file:
-                json.dump(progress, temp_file, indent=2, ensure_ascii=False)
-                temp_file.flush()
-                os.fsync(temp_file.fileno())
-                temp_filename = temp_file.name
-            os.replace(temp_filename, self.CURRENT_PROGRESS_FILE)
-            print(f"Saved current progress to {self.CURRENT_PROGRESS_FILE}")
-            logging.info(f"Saved current progress: {json.dumps(progress, ensure_ascii=False)}")
+            progress["last_updated"] = datetime.now().isoformat(timespec='seconds')
+            write_json_atomic(self.CURRENT_PROGRESS_FILE, progress, fsync=FSYNC_PROGRESS)
+            logger.info(f"Saved current progress to {self.CURRENT_PROGRESS_FILE}")
+            if DEBUG_DUMPS:
+                logging.info(f"Saved current progress: {dumps_json(progress, indent=False).decode('utf-8')}")
         except Exception as e:
-            print(f"Failed to save current progress: {e}")
+            logger.info(f"Failed to save current progress: {e}")
             logging.error(f"Failed to save current progress: {e}")
-        finally:
-            if temp_filename and os.path.exists(temp_filename):
-                try:
-                    os.remove(temp_filename)
-                    print(f"Cleaned up temporary file: {temp_filename}")
-                except Exception as e:
-                    print(f"Failed to clean up temporary file {temp_filename}: {e}")
 
     def load_scraped_progress(self) -> Dict:
-        default_progress = {
-            "completed_areas": [],
-            "current_area_index": 0,
-            "last_updated": None,
-            "all_results": {},
-            "current_progress": {
-                "area_name": None,
-                "current_page": 0,
-                "total_pages": 0,
-                "current_restaurant": 0,
-                "total_restaurants": 0,
-                "processed_restaurants": [],
-                "completed_pages": []
-            }
-        }
+        default_progress = merge_progress_defaults()
         if not os.path.exists(self.SCRAPED_PROGRESS_FILE):
-            print(f"No scraped progress file found, initializing {self.SCRAPED_PROGRESS_FILE}")
+            logger.info(f"No scraped progress file found, initializing {self.SCRAPED_PROGRESS_FILE}")
             self.save_scraped_progress(default_progress)
             return default_progress
         
         try:
-            with open(self.SCRAPED_PROGRESS_FILE, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
-            if not isinstance(progress, dict) or "current_progress" not in progress or "all_results" not in progress:
-                print(f"Invalid scraped progress file, resetting to default")
+            progress = load_json(self.SCRAPED_PROGRESS_FILE)
+            if not isinstance(progress, dict):
+                logger.info(f"Invalid scraped progress file, resetting to default")
                 logging.warning(f"Invalid scraped progress file structure")
                 self.save_scraped_progress(default_progress)
                 return default_progress
-            progress["current_progress"]["processed_restaurants"] = list(set(
-                str(item) for item in progress["current_progress"].get("processed_restaurants", [])
-            ))
-            progress["current_progress"]["completed_pages"] = sorted(list(set(
-                int(page) for page in progress["current_progress"].get("completed_pages", [])
-                if isinstance(page, (int, float)) and page >= 1
-            )))
-            print(f"Loaded scraped progress from {self.SCRAPED_PROGRESS_FILE}")
-            logging.info(f"Loaded scraped progress: {json.dumps(progress, ensure_ascii=False)}")
+            progress = merge_progress_defaults(progress)
+            if "all_results" in progress:
+                self.migrate_all_results(progress.pop("all_results"))
+                self.save_scraped_progress(progress)
+            logger.info(f"Loaded scraped progress from {self.SCRAPED_PROGRESS_FILE}")
+            if DEBUG_DUMPS:
+                logging.info(f"Loaded scraped progress: {dumps_json(progress, indent=False).decode('utf-8')}")
             return progress
         except Exception as e:
-            print(f"Error loading scraped progress: {e}")
+            logger.info(f"Error loading scraped progress: {e}")
             logging.error(f"Error loading scraped progress: {e}")
             self.save_scraped_progress(default_progress)
             return default_progress
 
+    def area_json_filename(self, area_name: str) -> str:
+        return os.path.join(self.output_dir, f"{area_name}.json")
+
+    def area_detailed_csv_filename(self, area_name: str) -> str:
+        return os.path.join(self.output_dir, f"{area_name}_detailed.csv")
+
+    def area_cache_filename(self, area_name: str) -> str:
+        return os.path.join(self.cache_dir, f"{area_name}.msgpack")
+
+    @staticmethod
+    def encode_cache_record(restaurant: Dict) -> bytes:
+        return msgpack.packb(restaurant, use_bin_type=True)
+
+    def reset_area_cache(self, area_name: str, area_results: List[Dict]):
+        """Rewrite an area's checkpoint log from scratch, dropping a record torn by an earlier crash"""
+        write_bytes_atomic(self.area_cache_filename(area_name), b''.join(map(self.encode_cache_record, area_results)))
+
+    def append_area_cache(self, area_name: str, restaurants: List[Dict]):
+        """Append finished restaurants to the area's checkpoint log, one record each"""
+        with open(self.area_cache_filename(area_name), 'ab') as f:
+            f.write(b''.join(map(self.encode_cache_record, restaurants)))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read_area_cache(self, cache_filename: str) -> List[Dict]:
+        with open(cache_filename, 'rb') as f:
+            # An incomplete trailing record is silently left out
+            return list(msgpack.Unpacker(f, raw=False))
+
+    def load_area_results(self, area_name: str) -> List[Dict]:
+        """Load an area from its in-progress checkpoint log if there is one, otherwise from its JSON file"""
+        cache_filename = self.area_cache_filename(area_name)
+        json_filename = self.area_json_filename(area_name)
+        try:
+            if os.path.exists(cache_filename):
+                return self.read_area_cache(cache_filename)
+            if os.path.exists(json_filename):
+                return load_json(json_filename)
+            return []
+        except Exception as e:
+            logger.info(f"Error loading results for {area_name}: {e}")
+            logging.error(f"Error loading results for {area_name}: {e}")
+            return []
+
+    def migrate_all_results(self, all_results: Dict):
+        """Move results kept in older scraped progress files into the per-area JSON files"""
+        for area_name, area_results in all_results.items():
+            if len(area_results) > len(self.load_area_results(area_name)):
+                write_json_atomic(self.area_json_filename(area_name), area_results)
+                logger.info(f"Migrated {len(area_results)} restaurants for {area_name} to {self.area_json_filename(area_name)}")
+
+    def save_progress(self, force: bool = False):
+        """Write both progress files, coalescing calls that arrive within PROGRESS_SAVE_INTERVAL"""
+        self._progress_dirty = True
+        if not force and time.monotonic() - self._last_progress_save < PROGRESS_SAVE_INTERVAL:
+            return
+        self.write_progress_snapshot(self.current_progress, self.scraped_progress)
+        self._progress_dirty = False
+        self._last_progress_save = time.monotonic()
+
+    async def save_progress_async(self, force: bool = False):
+        """Debounced like save_progress, but writes a snapshot of the progress from a worker thread"""
+        self._progress_dirty = True
+        if not force and time.monotonic() - self._last_progress_save < PROGRESS_SAVE_INTERVAL:
+            return
+        # Snapshots are taken and written in turn, so an older one can never replace a newer one
+        async with self._progress_write_lock:
+            self._progress_dirty = False
+            self._last_progress_save = time.monotonic()
+            current_progress, scraped_progress = copy.deepcopy((self.current_progress, self.scraped_progress))
+            await asyncio.to_thread(self.write_progress_snapshot, current_progress, scraped_progress)
+
+    def write_progress_snapshot(self, current_progress: Dict, scraped_progress: Dict):
+        self.save_current_progress(current_progress)
+        # Both files normally hold the same progress, so the scraped one is linked instead of written again
+        if self.same_progress(current_progress, scraped_progress) and self.link_scraped_progress():
+            scraped_progress["last_updated"] = current_progress["last_updated"]
+        else:
+            self.save_scraped_progress(scraped_progress)
+
+    @staticmethod
+    def same_progress(first: Dict, second: Dict) -> bool:
+        def comparable(progress):
+            return {key: value for key, value in progress.items() if key != "last_updated"}
+        return comparable(first) == comparable(second)
+
+    def link_scraped_progress(self) -> bool:
+        """Point scraped_progress.json at the current progress file, replacing it atomically"""
+        link_filename = f"{self.SCRAPED_PROGRESS_FILE}.tmp"
+        try:
+            Path(link_filename).unlink(missing_ok=True)
+            os.link(self.CURRENT_PROGRESS_FILE, link_filename)
+            os.replace(link_filename, self.SCRAPED_PROGRESS_FILE)
+            logging.info(f"Linked {self.SCRAPED_PROGRESS_FILE} to {self.CURRENT_PROGRESS_FILE}")
+            return True
+        except OSError as e:
+            logging.warning(f"Could not link {self.SCRAPED_PROGRESS_FILE}, writing it instead: {e}")
+            return False
+
     def save_scraped_progress(self, progress: Dict = None):
         if progress is None:
             progress = self.scraped_progress
-        temp_filename = None
         try:
-            progress["last_updated"] = datetime.now().isoformat()
-            if "current_progress" in progress:
-                progress["current_progress"]["completed_pages"] = sorted(list(set(
-                    int(page) for page in progress["current_progress"].get("completed_pages", [])
-                    if isinstance(page, (int, float)) and page >= 1
-                )))
-            content_str = json.dumps(progress, ensure_ascii=False)
-            logging.debug(f"Saving scraped_progress content: {content_str}")
-            json.dumps(progress, ensure_ascii=False)
-            with tempfile.NamedTemporaryFile('w', delete=False, dir='.') as temp_file:
-                json.dump(progress, temp_file, indent=2, ensure_ascii=False)
-                temp_file.flush()
-                os.fsync(temp_file.fileno())
-                temp_filename = temp_file.name
-            os.replace(temp_filename, self.SCRAPED_PROGRESS_FILE)
-            with open(self.SCRAPED_PROGRESS_FILE, 'r', encoding='utf-8') as f:
-                written_content = f.read()
-            logging.debug(f"Verified scraped_progress.json content after write: {written_content}")
-            mtime = os.path.getmtime(self.SCRAPED_PROGRESS_FILE)
-            print(f"Saved scraped progress to {self.SCRAPED_PROGRESS_FILE} at {datetime.fromtimestamp(mtime).isoformat()}")
+            progress["last_updated"] = datetime.now().isoformat(timespec='seconds')
+            if DEBUG_DUMPS:
+                logging.debug(f"Saving scraped_progress content: {dumps_json(progress, indent=False).decode('utf-8')}")
+            write_json_atomic(self.SCRAPED_PROGRESS_FILE, progress, fsync=FSYNC_PROGRESS)
+            logger.info(f"Saved scraped progress to {self.SCRAPED_PROGRESS_FILE} at {progress['last_updated']}")
             logging.info(f"Saved scraped progress to {self.SCRAPED_PROGRESS_FILE}")
         except Exception as e:
-            print(f"Failed to save scraped progress: {e}")
+            logger.info(f"Failed to save scraped progress: {e}")
             logging.error(f"Failed to save scraped progress: {e}")
-        finally:
-            if temp_filename and os.path.exists(temp_filename):
-                try:
-                    os.remove(temp_filename)
-                    print(f"Cleaned up temporary file: {temp_filename}")
-                except Exception as e:
-                    print(f"Failed to clean up temporary file {temp_filename}: {e}")
 
     def clear_log_file(self):
         try:
             with open('scraper.log', 'w'):
                 pass
             logging.info("Cleared scraper.log")
-            print("Cleared scraper.log")
+            logger.info("Cleared scraper.log")
         except Exception as e:
-            print(f"Failed to clear log file: {e}")
+            logger.info(f"Failed to clear log file: {e}")
             logging.error(f"Failed to clear log file: {e}")
 
     def print_progress_details(self):
         try:
-            with open(self.CURRENT_PROGRESS_FILE, 'r', encoding='utf-8') as f:
-                current = json.load(f)
-            print("\nCurrent Progress:")
-            print(json.dumps(current, indent=2, ensure_ascii=False))
+            current = self.current_progress
+            area_progress = current["current_progress"]
+            logger.info(
+                f"\nCurrent Progress: {len(current['completed_areas'])} areas completed, "
+                f"area index {current['current_area_index']}, area {area_progress['area_name']}, "
+                f"page {area_progress['current_page']}/{area_progress['total_pages']}, "
+                f"restaurant {area_progress['current_restaurant']}/{area_progress['total_restaurants']}"
+            )
+            if DEBUG_DUMPS:
+                logger.info(dumps_json(current).decode('utf-8'))
         except Exception as e:
-            print(f"Error printing current progress: {e}")
+            logger.info(f"Error printing current progress: {e}")
             logging.error(f"Error printing current progress: {e}")
 
     async def scrape_and_save_area(self, area_name: str, area_url: str) -> List[Dict]:
-        print(f"\n{'='*50}")
-        print(f"SCRAPING AREA: {area_name}")
-        print(f"URL: {area_url}")
-        print(f"{'='*50}\n")
-        
-        # Checkpoint at the start
-        self.save_current_progress()
-        self.save_scraped_progress()
-        self.commit_progress(f"Started scraping area {area_name}")
-        
-        all_area_results = self.scraped_progress["all_results"].get(area_name, [])
+        logger.info(f"\n{'='*50}")
+        logger.info(f"SCRAPING AREA: {area_name}")
+        logger.info(f"URL: {area_url}")
+        logger.info(f"{'='*50}\n")
+        
+        all_area_results = self.load_area_results(area_name)
+        # Restaurants are appended to the checkpoint log as they finish, so it starts from everything loaded so far
+        self.reset_area_cache(area_name, all_area_results)
         current_progress = self.current_progress["current_progress"]
         scraped_current_progress = self.scraped_progress["current_progress"]
         
@@ -246,7 +499,7 @@ class MainScraper:
         start_restaurant = current_progress["current_restaurant"] if is_resuming else 0
         
         if is_resuming:
-            print(f"Resuming area {area_name} from page {start_page} restaurant {start_restaurant + 1 if start_restaurant > 0 else 1}")
+            logger.info(f"Resuming area {area_name} from page {start_page} restaurant {start_restaurant + 1 if start_restaurant > 0 else 1}")
         else:
             current_progress.update({
                 "area_name": area_name,
@@ -257,47 +510,47 @@ class MainScraper:
                 "processed_restaurants": [],
                 "completed_pages": []
             })
-            scraped_current_progress.update(current_progress)
-            self.save_current_progress()
-            self.save_scraped_progress()
-            self.commit_progress(f"Started scraping area {area_name}")
-        
-        skip_categories = {"Grocery, Convenience Store", "Pharmacy", "Flowers", "Electronics", "Grocery, Hypermarket"}
+            # Its own lists, since both get every completed page and processed restaurant appended
+            scraped_current_progress.update(copy.deepcopy(current_progress))
+            await self.checkpoint_async(f"Started scraping area {area_name}")
         
+        # determine_total_pages already renders page 1, so its listing is kept rather than loaded twice
+        first_page_restaurants = []
         if current_progress["total_pages"] == 0:
-            total_pages = await self.determine_total_pages(area_url)
+            total_pages, first_page_restaurants = await self.determine_total_pages(area_url)
             current_progress["total_pages"] = total_pages
             scraped_current_progress["total_pages"] = total_pages
-            self.save_current_progress()
-            self.save_scraped_progress()
-            self.commit_progress(f"Determined {total_pages} pages for {area_name}")
+            await self.checkpoint_async(f"Determined {total_pages} pages for {area_name}")
         else:
             total_pages = current_progress["total_pages"]
         
-        print(f"Total pages for {area_name}: {total_pages}")
+        logger.info(f"Total pages for {area_name}: {total_pages}")
         
-        detailed_csv_filename = os.path.join(self.output_dir, f"{area_name}_detailed.csv")
+        detailed_csv_filename = self.area_detailed_csv_filename(area_name)
         
-        for page_num in range(start_page, total_pages + 1):
-            # Checkpoint before processing page
-            self.save_current_progress()
-            self.save_scraped_progress()
-            self.commit_progress(f"Starting page {page_num} in {area_name}")
-            
-            if page_num in current_progress["completed_pages"]:
-                print(f"Skipping completed page {page_num}")
-                continue
-            
-            page_url = area_url if page_num == 1 else (
-                re.sub(r'page=\d+', f'page={page_num}', area_url) if "page=" in area_url else
-                f"{area_url}{'&' if '?' in area_url else '?'}page={page_num}"
-            )
-            
-            print(f"\n--- Processing Page {page_num}/{total_pages} for {area_name} ---")
-            current_progress["current_page"] = page_num
-            scraped_current_progress["current_page"] = page_num
-            self.save_current_progress()
-            self.save_scraped_progress()
+        # Resume lookups use sets; the progress files keep their lists
+        scraped_keys = {(r.get("name", "").strip(), r.get("page", 0)) for r in all_area_results}
+        processed_names = set(current_progress["processed_restaurants"])
+        completed_pages = set(current_progress["completed_pages"])
+        
+        def mark_processed(restaurant_name):
+            if restaurant_name and restaurant_name not in processed_names:
+                processed_names.add(restaurant_name)
+                current_progress["processed_restaurants"].append(restaurant_name)
+                scraped_current_progress["processed_restaurants"].append(restaurant_name)
+        
+        area_url_parts = urlsplit(area_url)
+        area_query = [(key, value) for key, value in parse_qsl(area_url_parts.query, keep_blank_values=True) if key != "page"]
+        
+        async def fetch_listing(page_num):
+            if page_num == 1 and first_page_restaurants:
+                logger.info(f"Found {len(first_page_restaurants)} restaurants on page 1")
+                return first_page_restaurants
+            if page_num == 1:
+                page_url = area_url
+            else:
+                page_query = area_query + [("page", str(page_num))]
+                page_url = urlunsplit(area_url_parts._replace(query=urlencode(page_query)))
             
             max_retries = 3
             for attempt in range(max_retries):
@@ -305,176 +558,161 @@ class MainScraper:
                     restaurants_on_page = await self.get_page_restaurants(page_url, page_num)
                     if not restaurants_on_page:
                         raise Exception("No restaurants found")
-                    print(f"Found {len(restaurants_on_page)} restaurants on page {page_num}")
-                    break
+                    logger.info(f"Found {len(restaurants_on_page)} restaurants on page {page_num}")
+                    return restaurants_on_page
                 except Exception as e:
-                    print(f"Error on page {page_num}: {e}")
+                    logger.info(f"Error on page {page_num}: {e}")
                     logging.error(f"Error on page {page_num}: {e}")
                     if attempt < max_retries - 1:
-                        print(f"Retrying ({attempt + 1}/{max_retries})...")
-                        await asyncio.sleep(5)
+                        logger.info(f"Retrying ({attempt + 1}/{max_retries})...")
+                        await asyncio.sleep(2 ** attempt)
                     else:
-                        print(f"Skipping page {page_num} after {max_retries} attempts")
-                        restaurants_on_page = []
-            
-            if current_progress["total_restaurants"] == 0 or page_num > start_page:
-                current_progress["total_restaurants"] = len(restaurants_on_page)
-                scraped_current_progress["total_restaurants"] = len(restaurants_on_page)
-                if not is_resuming or page_num > start_page:
-                    current_progress["current_restaurant"] = 0
-                    scraped_current_progress["current_restaurant"] = 0
-            
-            page_restaurants = []
-            for rest_idx, restaurant in enumerate(restaurants_on_page):
-                rest_num = rest_idx + 1
-                restaurant_name = restaurant.get("name", "").strip()
+                        logger.info(f"Skipping page {page_num} after {max_retries} attempts")
+            return []
+        
+        # Upcoming listings load while the current page's restaurants are scraped
+        listing_tasks = {}
+        
+        def prefetch_listings(page_num):
+            scheduled = 0
+            while page_num <= total_pages and scheduled < LISTING_PREFETCH_PAGES:
+                if page_num not in completed_pages:
+                    if page_num not in listing_tasks:
+                        listing_tasks[page_num] = asyncio.create_task(fetch_listing(page_num))
+                    scheduled += 1
+                page_num += 1
+        
+        remaining_pages = [page_num for page_num in range(start_page, total_pages + 1) if page_num not in completed_pages]
+        skipped_pages = total_pages - start_page + 1 - len(remaining_pages)
+        if skipped_pages:
+            logger.info(f"Skipping {skipped_pages} completed pages")
+        
+        try:
+            for page_num in remaining_pages:
+                logger.info(f"\n--- Processing Page {page_num}/{total_pages} for {area_name} ---")
+                current_progress["current_page"] = page_num
+                scraped_current_progress["current_page"] = page_num
+                await self.save_progress_async()
                 
-                if rest_num <= current_progress["current_restaurant"]:
-                    print(f"Skipping processed restaurant {rest_num}/{len(restaurants_on_page)}: {restaurant_name}")
-                    continue
+                prefetch_listings(page_num)
+                restaurants_on_page = await listing_tasks.pop(page_num)
+                
+                if current_progress["total_restaurants"] == 0 or page_num > start_page:
+                    current_progress["total_restaurants"] = len(restaurants_on_page)
+                    scraped_current_progress["total_restaurants"] = len(restaurants_on_page)
+                    if not is_resuming or page_num > start_page:
+                        current_progress["current_restaurant"] = 0
+                        scraped_current_progress["current_restaurant"] = 0
+                
+                page_restaurants = []
+                pending = []
+                resume_from = current_progress["current_restaurant"]
+                if resume_from:
+                    logger.info(f"Skipping {min(resume_from, len(restaurants_on_page))} processed restaurants on page {page_num}")
+                # Skipped categories are re-filtered from the listing on resume, so they never reach the progress files
+                skipped_categories = 0
+                for rest_num, restaurant in enumerate(restaurants_on_page[resume_from:], resume_from + 1):
+                    restaurant_name = restaurant.get("name", "").strip()
+                    
+                    if SKIP_CATEGORIES_RE.search(restaurant.get('cuisine', '')):
+                        skipped_categories += 1
+                        continue
+                    
+                    is_already_processed = (restaurant_name, page_num) in scraped_keys or restaurant_name in processed_names
+                    
+                    if is_already_processed:
+                        logger.info(f"Skipping restaurant {rest_num}/{len(restaurants_on_page)}: {restaurant_name} - Already processed")
+                        continue
+                    
+                    pending.append((rest_num, restaurant))
+                if skipped_categories:
+                    logger.info(f"Skipping {skipped_categories} restaurants on page {page_num} by category: {', '.join(SKIP_CATEGORIES)}")
                 
-                is_already_processed = any(
-                    r.get("name", "").strip() == restaurant_name and r.get("page", 0) == page_num
-                    for r in all_area_results
-                ) or restaurant_name in current_progress["processed_restaurants"]
+                # Restaurants finish out of order, so the resume cursor only moves over the finished prefix
+                unfinished = {rest_num for rest_num, _ in pending}
                 
-                if is_already_processed:
-                    print(f"Skipping restaurant {rest_num}/{len(restaurants_on_page)}: {restaurant_name} - Already processed")
+                def advance_cursor():
+                    rest_num = current_progress["current_restaurant"]
+                    while rest_num < len(restaurants_on_page) and rest_num + 1 not in unfinished:
+                        rest_num += 1
                     current_progress["current_restaurant"] = rest_num
                     scraped_current_progress["current_restaurant"] = rest_num
-                    self.save_current_progress()
-                    self.save_scraped_progress()
-                    continue
                 
-                current_progress["current_restaurant"] = rest_num
-                scraped_current_progress["current_restaurant"] = rest_num
+                advance_cursor()
+                await self.save_progress_async()
                 
-                if any(category in restaurant['cuisine'] for category in skip_categories):
-                    print(f"\nSkipping restaurant {rest_num}/{len(restaurants_on_page)}: {restaurant_name} - Category: {restaurant['cuisine']}")
-                    if restaurant_name and restaurant_name not in current_progress["processed_restaurants"]:
-                        current_progress["processed_restaurants"].append(restaurant_name)
-                        scraped_current_progress["processed_restaurants"].append(restaurant_name)
-                    self.save_current_progress()
-                    self.save_scraped_progress()
-                    continue
-                
-                print(f"\nProcessing restaurant {rest_num}/{len(restaurants_on_page)} on page {page_num}: {restaurant_name}")
+                semaphore = asyncio.Semaphore(MAX_CONCURRENT_RESTAURANTS)
                 
-                try:
-                    restaurant.setdefault("menu_items", {})
-                    restaurant.setdefault("info", {})
-                    restaurant.setdefault("reviews", {})
-                    restaurant["page"] = page_num
-                    
-                    async def timeout_task(task, timeout=60):
+                async def process_restaurant(rest_num, restaurant):
+                    restaurant_name = restaurant.get("name", "").strip()
+                    async with semaphore:
+                        logger.info(f"\nProcessing restaurant {rest_num}/{len(restaurants_on_page)} on page {page_num}: {restaurant_name}")
                         try:
-                            return await asyncio.wait_for(task, timeout=timeout)
-                        except asyncio.TimeoutError:
-                            print(f"Timeout while processing task for {restaurant_name}")
-                            logging.error(f"Timeout while processing task for {restaurant_name}")
-                            return None
-                    
-                    print(f"Fetching menu for {restaurant_name}...")
-                    menu_data = await timeout_task(self.talabat_scraper.get_restaurant_menu(restaurant['url']))
-                    if menu_data:
-                        restaurant['menu_items'] = menu_data
-                    else:
-                        print(f"No menu data retrieved for {restaurant_name}")
-                    
-                    print(f"Fetching info for {restaurant_name}...")
-                    info_data = await timeout_task(self.talabat_scraper.get_restaurant_info(restaurant['url']))
-                    if info_data:
-                        restaurant['info'] = info_data
-                    else:
-                        print(f"No info data retrieved for {restaurant_name}")
-                    
-                    if restaurant['info'].get('Reviews URL') and restaurant['info']['Reviews URL'] != 'Not Available':
-                        print(f"Fetching reviews for {restaurant_name}...")
-                        reviews_data = self.talabat_scraper.get_reviews_data(restaurant['info']['Reviews URL'])
-                        restaurant['reviews'] = reviews_data or {}
-                    else:
-                        print(f"No reviews URL available for {restaurant_name}")
-                    
-                    page_restaurants.append(restaurant)
-                    all_area_results.append(restaurant)
-                    if restaurant_name and restaurant_name not in current_progress["processed_restaurants"]:
-                        current_progress["processed_restaurants"].append(restaurant_name)
-                        scraped_current_progress["processed_restaurants"].append(restaurant_name)
-                    self.scraped_progress["all_results"][area_name] = all_area_results
-                    logging.debug(f"Updated all_results for {area_name}: {len(all_area_results)} restaurants")
-                    
-                    self.save_current_progress()
-                    self.save_scraped_progress()
-                    
-                    await asyncio.sleep(2)
+                            await self.scrape_restaurant_details(restaurant, page_num)
+                            
+                            page_restaurants.append(restaurant)
+                            all_area_results.append(restaurant)
+                            scraped_keys.add((restaurant_name, page_num))
+                            mark_processed(restaurant_name)
+                            unfinished.discard(rest_num)
+                            advance_cursor()
+                            await asyncio.to_thread(self.append_area_cache, area_name, [restaurant])
+                            logging.debug(f"Saved {len(all_area_results)} restaurants for {area_name}")
+                            
+                            await self.save_progress_async()
+                        
+                        except Exception as e:
+                            logger.info(f"Error processing restaurant {rest_num}/{len(restaurants_on_page)}: {restaurant_name}: {e}")
+                            logging.error(f"Error processing restaurant {restaurant_name}: {e}")
+                            traceback.print_exc()
+                            mark_processed(restaurant_name)
+                            unfinished.discard(rest_num)
+                            advance_cursor()
+                            await self.save_progress_async(force=True)
                 
-                except Exception as e:
-                    print(f"Error processing restaurant {rest_num}/{len(restaurants_on_page)}: {restaurant_name}: {e}")
-                    logging.error(f"Error processing restaurant {restaurant_name}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    if restaurant_name and restaurant_name not in current_progress["processed_restaurants"]:
-                        current_progress["processed_restaurants"].append(restaurant_name)
-                        scraped_current_progress["processed_restaurants"].append(restaurant_name)
-                    self.save_current_progress()
-                    self.save_scraped_progress()
-            
-            # Save JSON after processing all restaurants on the page
-            try:
-                json_filename = os.path.join(self.output_dir, f"{area_name}.json")
-                with open(json_filename, 'w', encoding='utf-8') as f:
-                    json.dump(all_area_results, f, indent=2, ensure_ascii=False)
-                logging.info(f"Saved {len(all_area_results)} restaurants to {json_filename}")
-            except Exception as e:
-                print(f"Failed to save JSON for {area_name}: {e}")
-                logging.error(f"Failed to save JSON for {area_name}: {e}")
-            
-            # Save restaurants for the page to detailed CSV
-            if page_restaurants:
-                try:
-                    print(f"Saving {len(page_restaurants)} restaurants from page {page_num} to {detailed_csv_filename}")
-                    self.create_detailed_excel_sheet(area_name, page_restaurants, detailed_csv_filename)
-                except Exception as e:
-                    print(f"Failed to save detailed CSV for page {page_num}: {e}")
-                    logging.error(f"Failed to save detailed CSV for page {page_num}: {e}")
-            
-            # Clear log file
-            self.clear_log_file()
-            
-            # Mark page as complete
-            if page_num not in current_progress["completed_pages"]:
-                current_progress["completed_pages"].append(page_num)
-                scraped_current_progress["completed_pages"].append(page_num)
-            current_progress["current_restaurant"] = 0
-            scraped_current_progress["current_restaurant"] = 0
-            self.save_current_progress()
-            self.save_scraped_progress()
-            self.commit_progress(f"Completed page {page_num} in {area_name}")
-            await asyncio.sleep(3)
-        
-        # Final JSON save
-        json_filename = os.path.join(self.output_dir, f"{area_name}.json")
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_area_results, f, indent=2, ensure_ascii=False)
+                page_start = len(all_area_results)
+                await asyncio.gather(*(process_restaurant(rest_num, restaurant) for rest_num, restaurant in pending))
+                # Keep the listing order in the outputs regardless of completion order
+                listing_order = {id(restaurant): rest_num for rest_num, restaurant in pending}
+                page_restaurants.sort(key=lambda r: listing_order[id(r)])
+                all_area_results[page_start:] = page_restaurants
+                
+                # Save restaurants for the page to detailed CSV
+                if page_restaurants:
+                    try:
+                        logger.info(f"Saving {len(page_restaurants)} restaurants from page {page_num} to {detailed_csv_filename}")
+                        self.create_detailed_excel_sheet(area_name, page_restaurants, detailed_csv_filename)
+                    except Exception as e:
+                        logger.info(f"Failed to save detailed CSV for page {page_num}: {e}")
+                        logging.error(f"Failed to save detailed CSV for page {page_num}: {e}")
+                
+                # Clear log file
+                self.clear_log_file()
+                
+                # Mark page as complete
+                if page_num not in completed_pages:
+                    completed_pages.add(page_num)
+                    current_progress["completed_pages"].append(page_num)
+                    scraped_current_progress["completed_pages"].append(page_num)
+                current_progress["current_restaurant"] = 0
+                scraped_current_progress["current_restaurant"] = 0
+                await self.checkpoint_async(f"Completed page {page_num} in {area_name}")
+                await asyncio.sleep(3)
+        finally:
+            for task in listing_tasks.values():
+                task.cancel()
+        
+        # Final JSON save; the pretty JSON is the deliverable, so the in-progress cache is no longer needed
+        json_filename = self.area_json_filename(area_name)
+        await write_json_atomic_async(json_filename, all_area_results)
+        Path(self.area_cache_filename(area_name)).unlink(missing_ok=True)
         logging.info(f"Final save: {len(all_area_results)} restaurants to {json_filename}")
         
-        # Create simplified Excel workbook
-        simplified_workbook = Workbook()
-        self.create_excel_sheet(simplified_workbook, area_name, all_area_results)
-        simplified_excel_filename = os.path.join(self.output_dir, f"{area_name}.xlsx")
-        simplified_workbook.save(simplified_excel_filename)
-        print(f"Simplified Excel file saved: {simplified_excel_filename}")
+        simplified_excel_filename = self.write_area_workbook(area_name, all_area_results)
         
-        # Upload both files to Google Drive
-        if self.upload_to_drive(simplified_excel_filename):
-            print(f"Uploaded {simplified_excel_filename} to Google Drive")
-        else:
-            print(f"Failed to upload {simplified_excel_filename} to Google Drive")
-        
-        if self.upload_to_drive(detailed_csv_filename):
-            print(f"Uploaded {detailed_csv_filename} to Google Drive")
-        else:
-            print(f"Failed to upload {detailed_csv_filename} to Google Drive")
+        # Upload both files to Google Drive while the next area is scraped
+        self.schedule_upload(simplified_excel_filename)
+        self.schedule_upload(detailed_csv_filename)
         
         current_progress.update({
             "area_name": None,
@@ -485,166 +723,340 @@ class MainScraper:
             "processed_restaurants": [],
             "completed_pages": []
         })
-        scraped_current_progress.update(current_progress)
-        self.save_current_progress()
-        self.save_scraped_progress()
-        self.print_progress_details()
-        self.commit_progress(f"Completed area {area_name}")
+        scraped_current_progress.update(copy.deepcopy(current_progress))
+        # Committed by the caller together with the completed_areas update
+        await self.save_progress_async(force=True)
         
-        print(f"Saved {len(all_area_results)} restaurants for {area_name}")
+        logger.info(f"Saved {len(all_area_results)} restaurants for {area_name}")
         return all_area_results
 
+    async def scrape_restaurant_details(self, restaurant: Dict, page_num: int):
+        """Fill in the menu, info and reviews of one listing entry in place"""
+        restaurant_name = restaurant.get("name", "").strip()
+        restaurant.setdefault("menu_items", {})
+        restaurant.setdefault("info", {})
+        restaurant.setdefault("reviews", {})
+        restaurant["page"] = page_num
+        
+        cached = await asyncio.to_thread(self.load_cached_details, restaurant['url'])
+        if cached:
+            logger.info(f"Reusing details of {restaurant_name} scraped {int(time.time() - cached['scraped_at']) // 60} minutes ago")
+            restaurant.update(menu_items=cached["menu_items"], info=cached["info"], reviews=cached["reviews"])
+            return
+        
+        async def timeout_task(task, timeout=60):
+            try:
+                return await asyncio.wait_for(task, timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.info(f"Timeout while processing task for {restaurant_name}")
+                logging.error(f"Timeout while processing task for {restaurant_name}")
+                return None
+        
+        async def fetch_menu():
+            logger.info(f"Fetching menu for {restaurant_name}...")
+            # The menu scrape blocks on Selenium, so it runs on its own loop in a worker thread; the 60s limit
+            # is applied on that loop, where the scrape can be cancelled, and its TimeoutError surfaces here
+            menu_data = await timeout_task(
+                self.run_selenium(self.talabat_scraper.get_restaurant_menu_sync, restaurant['url'], 60), timeout=None)
+            if menu_data:
+                restaurant['menu_items'] = menu_data
+            else:
+                logger.info(f"No menu data retrieved for {restaurant_name}")
+        
+        async def fetch_info_and_reviews():
+            logger.info(f"Fetching info for {restaurant_name}...")
+            info_data = await timeout_task(self.talabat_scraper.get_restaurant_info(
+                restaurant['url'], browser=await self.get_browser("chromium")))
+            if info_data:
+                restaurant['info'] = info_data
+            else:
+                logger.info(f"No info data retrieved for {restaurant_name}")
+            
+            if restaurant['info'].get('Reviews URL') and restaurant['info']['Reviews URL'] != 'Not Available':
+                logger.info(f"Fetching reviews for {restaurant_name}...")
+                # get_reviews_data drives Selenium synchronously, so it runs in a worker thread
+                reviews_data = await self.run_selenium(self.talabat_scraper.get_reviews_data, restaurant['info']['Reviews URL'])
+                restaurant['reviews'] = reviews_data or {}
+            else:
+                logger.info(f"No reviews URL available for {restaurant_name}")
+        
+        # The menu does not depend on the info page, only the reviews URL does; a failure in one keeps what the other got
+        results = await asyncio.gather(fetch_menu(), fetch_info_and_reviews(), return_exceptions=True)
+        for part, result in zip(("menu", "info and reviews"), results):
+            if isinstance(result, Exception):
+                logger.info(f"Error fetching {part} for {restaurant_name}: {result}")
+                logging.error(f"Error fetching {part} for {restaurant_name}: {result}")
+        
+        # A reviews page that failed to load is scraped again next time rather than reused
+        reviews_missing = not restaurant['reviews'] and restaurant['info'].get('Reviews URL', 'Not Available') != 'Not Available'
+        if restaurant['menu_items'] and restaurant['info'] and not reviews_missing:
+            try:
+                await asyncio.to_thread(self.save_cached_details, restaurant)
+            except OSError as e:
+                logging.warning(f"Could not cache details of {restaurant_name}: {e}")
+
+    async def run_selenium(self, func, *args):
+        """Run a blocking Selenium scrape in the Selenium thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._selenium_executor, func, *args)
+
+    def details_cache_filename(self, url: str) -> str:
+        # Listing links carry the area in their query string; the path identifies the restaurant
+        key = urlsplit(url).path.rstrip("/")
+        return os.path.join(self.details_cache_dir, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+    def load_cached_details(self, url: str) -> Optional[Dict]:
+        """Return the menu, info and reviews scraped for `url` within DETAILS_CACHE_TTL, if any"""
+        if FORCE_RESCRAPE:
+            return None
+        try:
+            entry = load_json(self.details_cache_filename(url))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("scraped_at", 0) > DETAILS_CACHE_TTL:
+            return None
+        return entry
+
+    def save_cached_details(self, restaurant: Dict):
+        entry = {
+            "scraped_at": time.time(),
+            "menu_items": restaurant["menu_items"],
+            "info": restaurant["info"],
+            "reviews": restaurant["reviews"],
+        }
+        write_bytes_atomic(self.details_cache_filename(restaurant["url"]), dumps_json(entry, indent=False), fsync=False)
+
     def commit_progress(self, message: str):
+        if self._progress_dirty:
+            self.save_progress(force=True)
+        self.git_commit_progress(message)
+
+    async def commit_progress_async(self, message: str):
+        """Checkpoint and commit like commit_progress, with the file and git work off the event loop"""
+        await self.save_progress_async(force=True)
+        await asyncio.to_thread(self.git_commit_progress, message)
+
+    async def checkpoint_async(self, message: str):
+        """Save progress, committing it only when COMMIT_FREQUENCY asks for commits within an area"""
+        if COMMIT_FREQUENCY == "page":
+            await self.commit_progress_async(message)
+        else:
+            await self.save_progress_async(force=True)
+
+    def git_commit_progress(self, message: str):
         try:
-            status_result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True)
-            logging.debug(f"Git status before staging: {status_result.stdout}")
-            
-            subprocess.run(["git", "add", self.CURRENT_PROGRESS_FILE], check=True)
-            subprocess.run(["git", "add", self.SCRAPED_PROGRESS_FILE], check=True)
-            subprocess.run(["git", "add", self.output_dir], check=True)
-            
-            diff_result = subprocess.run(["git", "diff", "--staged"], capture_output=True, text=True, check=True)
-            logging.debug(f"Git diff --staged: {diff_result.stdout}")
+            subprocess.run(["git", "add", self.CURRENT_PROGRESS_FILE, self.SCRAPED_PROGRESS_FILE, self.output_dir], check=True)
             
             result = subprocess.run(["git", "commit", "-m", message], capture_output=True, text=True)
             if result.returncode == 0:
-                print(f"Committed progress: {message}")
+                logger.info(f"Committed progress: {message}")
                 logging.info(f"Committed progress: {message}")
             else:
-                print(f"No changes to commit for: {message}")
+                logger.info(f"No changes to commit for: {message}")
                 logging.warning(f"No changes to commit: {result.stderr}")
             
             push_result = subprocess.run(["git", "push"], capture_output=True, text=True)
             if push_result.returncode == 0:
-                print(f"Pushed progress: {message}")
+                logger.info(f"Pushed progress: {message}")
                 logging.info(f"Pushed progress: {message}")
             else:
-                print(f"Failed to push progress: {push_result.stderr}")
+                logger.info(f"Failed to push progress: {push_result.stderr}")
                 logging.error(f"Failed to push progress: {push_result.stderr}")
-            
-            # Clean git temporary files
-            gc_result = subprocess.run(["git", "gc", "--prune=now"], capture_output=True, text=True)
-            if gc_result.returncode == 0:
-                print("Cleaned git temporary files")
-                logging.info("Cleaned git temporary files")
-            else:
-                print(f"Failed to clean git temporary files: {gc_result.stderr}")
-                logging.error(f"Failed to clean git temporary files: {gc_result.stderr}")
         
         except subprocess.CalledProcessError as e:
-            print(f"Failed to commit progress: {e}")
+            logger.info(f"Failed to commit progress: {e}")
             logging.error(f"Failed to commit progress: {e}")
 
-    async def determine_total_pages(self, area_url: str) -> int:
-        print(f"Determining total pages for URL: {area_url}")
-        try:
-            async with async_playwright() as p:
-                browser = await p.firefox.launch(headless=True)
+    def git_gc(self):
+        """Clean git temporary files; run once per run since gc rewrites the pack files"""
+        gc_result = subprocess.run(["git", "gc", "--prune=now"], capture_output=True, text=True)
+        if gc_result.returncode == 0:
+            logger.info("Cleaned git temporary files")
+            logging.info("Cleaned git temporary files")
+        else:
+            logger.info(f"Failed to clean git temporary files: {gc_result.stderr}")
+            logging.error(f"Failed to clean git temporary files: {gc_result.stderr}")
+
+    async def get_browser(self, engine: str):
+        """Return the shared browser for `engine` ("firefox" or "chromium"), launching it if needed"""
+        async with self._browser_lock:
+            browser = self._browsers.get(engine)
+            if browser is None or not browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                launch_args = {'args': ['--no-sandbox']} if engine == "chromium" else {}
+                browser = await getattr(self._playwright, engine).launch(headless=True, **launch_args)
+                self._browsers[engine] = browser
+            return browser
+
+    async def close_browsers(self):
+        for browser in self._browsers.values():
+            try:
+                await browser.close()
+            except Exception as e:
+                logging.warning(f"Error closing browser: {e}")
+        self._browsers.clear()
+        self._listing_context = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def new_listing_page(self):
+        """Open a tab in the listing context shared by all listing pages, creating the context if needed"""
+        browser = await self.get_browser(LISTING_ENGINE)
+        async with self._browser_lock:
+            context = self._listing_context
+            if context is None or context.browser is not browser:
                 context = await browser.new_context(
                     viewport={'width': 1920, 'height': 1080},
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 )
-                page = await context.new_page()
-                page.set_default_timeout(120000)
-                
-                response = await page.goto(area_url, wait_until='domcontentloaded')
-                if not response or not response.ok:
-                    print(f"Failed to load page: {response.status if response else 'No response'}")
-                    return 1
-                
-                await page.wait_for_selector("ul[data-test='pagination'], .vendor-card, [data-testid='restaurant-a']", timeout=30000)
-                
-                last_page = 1
-                pagination = await page.query_selector("ul[data-test='pagination']")
-                if pagination:
-                    items = await pagination.query_selector_all("li[data-testid='paginate-link']")
-                    if items and len(items) > 1:
-                        last_page_item = items[-2]
-                        last_page_link = await last_page_item.query_selector("a[page]")
-                        if last_page_link:
-                            last_page_attr = await last_page_link.get_attribute("page")
-                            if last_page_attr and last_page_attr.isdigit():
-                                last_page = int(last_page_attr)
-                
-                await browser.close()
-                return last_page
+                await context.route("**/*", block_unneeded_requests)
+                self._listing_context = context
+        page = await context.new_page()
+        page.set_default_timeout(30000)
+        return page
+
+    async def determine_total_pages(self, area_url: str) -> Tuple[int, List[Dict]]:
+        """Return the page count of an area and the restaurants on its first page, which is loaded anyway"""
+        logger.info(f"Determining total pages for URL: {area_url}")
+        page = None
+        try:
+            page = await self.new_listing_page()
+            
+            response = await page.goto(area_url, wait_until='commit')
+            if not response or not response.ok:
+                logger.info(f"Failed to load page: {response.status if response else 'No response'}")
+                return 1, []
+            
+            await page.wait_for_selector("ul[data-test='pagination'], .vendor-card, [data-testid='restaurant-a']", timeout=30000)
+            # Cards can show up before the pagination below them has been parsed
+            await page.wait_for_load_state('domcontentloaded')
+            
+            # The last numbered link sits just before "next"; read it in one round trip
+            total_pages = await page.evaluate("""() => {
+                const pagination = document.querySelector("ul[data-test='pagination']");
+                if (!pagination) return 1;
+                const items = pagination.querySelectorAll("li[data-testid='paginate-link']");
+                if (items.length < 2) return 1;
+                const link = items[items.length - 2].querySelector("a[page]");
+                const lastPage = link && link.getAttribute("page");
+                return lastPage && /^\\d+$/.test(lastPage) ? parseInt(lastPage, 10) : 1;
+            }""")
+            
+            try:
+                first_page_restaurants = await self.talabat_scraper._extract_restaurants_from_page(page, 1)
+            except Exception as e:
+                logger.info(f"Error reading the first page of {area_url}, it will be loaded again: {e}")
+                first_page_restaurants = []
+            return total_pages, first_page_restaurants
         except Exception as e:
-            print(f"Error determining total pages: {e}")
-            return 1
+            logger.info(f"Error determining total pages: {e}")
+            return 1, []
+        finally:
+            if page:
+                await page.close()
 
     async def get_page_restaurants(self, page_url: str, page_num: int) -> List[Dict]:
-        browser = None
+        page = None
         try:
-            async with async_playwright() as p:
-                browser = await p.firefox.launch(headless=True)
-                context = await browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                )
-                page = await context.new_page()
-                page.set_default_timeout(120000)
-                
-                response = await page.goto(page_url, wait_until='domcontentloaded')
-                if not response or not response.ok:
-                    print(f"Failed to load page {page_num}: {response.status if response else 'No response'}")
-                    return []
-                
-                await page.wait_for_selector(".vendor-card, [data-testid='restaurant-a']", timeout=30000)
-                return await self.talabat_scraper._extract_restaurants_from_page(page, page_num)
+            page = await self.new_listing_page()
+            
+            response = await page.goto(page_url, wait_until='commit')
+            if not response or not response.ok:
+                logger.info(f"Failed to load page {page_num}: {response.status if response else 'No response'}")
+                return []
+            
+            await page.wait_for_selector(".vendor-card, [data-testid='restaurant-a']", timeout=30000)
+            return await self.talabat_scraper._extract_restaurants_from_page(page, page_num)
         except Exception as e:
-            print(f"Error getting page restaurants: {e}")
-            import traceback
+            logger.info(f"Error getting page restaurants: {e}")
             traceback.print_exc()
             return []
         finally:
-            if browser:
-                await browser.close()
+            if page:
+                await page.close()
+
+    def write_area_workbook(self, area_name: str, area_results: List[Dict]) -> str:
+        """Write the simplified Excel workbook of one area and return its file name"""
+        simplified_excel_filename = os.path.join(self.output_dir, f"{area_name}.xlsx")
+        simplified_workbook = xlsxwriter.Workbook(simplified_excel_filename, XLSX_OPTIONS)
+        self.create_excel_sheet(simplified_workbook, area_name, area_results)
+        simplified_workbook.close()
+        logger.info(f"Simplified Excel file saved: {simplified_excel_filename}")
+        return simplified_excel_filename
+
+    async def reuse_area_results(self, area_name: str, source_area: str):
+        """Give an area that shares its listing URL with an already scraped one the same output files"""
+        json_filename = self.area_json_filename(area_name)
+        await asyncio.to_thread(shutil.copyfile, self.area_json_filename(source_area), json_filename)
+        area_results = await asyncio.to_thread(load_json, json_filename)
+        
+        # The detailed CSV has no area column, so it is copied; the workbook's sheet is named after the area
+        detailed_csv_filename = self.area_detailed_csv_filename(area_name)
+        source_csv_filename = self.area_detailed_csv_filename(source_area)
+        if os.path.exists(source_csv_filename):
+            await asyncio.to_thread(shutil.copyfile, source_csv_filename, detailed_csv_filename)
+        else:
+            Path(detailed_csv_filename).unlink(missing_ok=True)
+            await asyncio.to_thread(self.create_detailed_excel_sheet, area_name, area_results, detailed_csv_filename)
+        simplified_excel_filename = await asyncio.to_thread(self.write_area_workbook, area_name, area_results)
+        
+        self.schedule_upload(simplified_excel_filename)
+        self.schedule_upload(detailed_csv_filename)
+        logger.info(f"{area_name} has the same URL as {source_area}, reusing its results")
 
     def create_excel_sheet(self, workbook, sheet_name: str, data: List[Dict]):
-        sheet = workbook.create_sheet(title=sheet_name)
+        sheet = workbook.add_worksheet(sheet_name)
+        headers = SIMPLIFIED_HEADERS
         try:
             simplified_data = []
-            for restaurant in data:
-                restaurant_info = {
-                    "Name": restaurant.get("name", ""),
-                    "Cuisine": restaurant.get("cuisine", ""),
-                    "Rating": restaurant.get("rating", ""),
-                    "Delivery Time": restaurant.get("delivery_time", ""),
-                    "Delivery Fee": restaurant.get("delivery_fee", ""),
-                    "Min Order": restaurant.get("min_order", ""),
-                    "URL": restaurant.get("url", ""),
-                }
-                if restaurant.get("info"):
-                    restaurant_info.update({
-                        "Address": restaurant["info"].get("Address", ""),
-                        "Working Hours": restaurant["info"].get("Working Hours", ""),
-                    })
-                if restaurant.get("reviews") and restaurant["reviews"].get("Rating_value"):
-                    restaurant_info.update({
-                        "Rating Value": restaurant["reviews"]["Rating_value"],
-                        "Ratings Count": restaurant["reviews"].get("Ratings_count", ""),
-                        "Reviews Count": restaurant["reviews"].get("Reviews_count", ""),
-                    })
-                if restaurant.get("menu_items"):
-                    restaurant_info["Menu Categories"] = len(restaurant["menu_items"])
-                    item_count = sum(len(items) for items in restaurant["menu_items"].values())
-                    restaurant_info["Menu Items"] = item_count
-                simplified_data.append(restaurant_info)
+            col_widths = [len(header) for header in headers]
+            for row in map(simplified_row, data):
+                for i, value in enumerate(row):
+                    length = len(str(value))
+                    if length > col_widths[i]:
+                        col_widths[i] = length
+                simplified_data.append(row)
             
             if simplified_data:
-                df = pd.DataFrame(simplified_data)
-                for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-                    for c_idx, value in enumerate(row, 1):
-                        sheet.cell(row=r_idx, column=c_idx, value=value)
-                for column in sheet.columns:
-                    max_length = max(len(str(cell.value or "")) for cell in column)
-                    column_letter = get_column_letter(column[0].column)
-                    sheet.column_dimensions[column_letter].width = min(max_length + 2, 50)
+                sheet.write_row(0, 0, headers, workbook.add_format({'bold': True}))
+                for r_idx, row in enumerate(simplified_data, 1):
+                    sheet.write_row(r_idx, 0, row)
+                for i, width in enumerate(col_widths):
+                    sheet.set_column(i, i, min(width + 2, 50))
             else:
-                sheet.cell(row=1, column=1, value="No data found for this area")
+                sheet.write(0, 0, "No data found for this area")
         except Exception as e:
-            print(f"Error creating Excel sheet for {sheet_name}: {str(e)}")
-            sheet.cell(row=1, column=1, value=f"Error processing data: {str(e)}")
+            logger.info(f"Error creating Excel sheet for {sheet_name}: {str(e)}")
+            sheet.write(0, 0, f"Error processing data: {str(e)}")
+
+    def write_combined_workbook(self, excel_filename: str, area_names: List[str]):
+        """Build the combined workbook in one pass from the per-area JSON files"""
+        workbook = xlsxwriter.Workbook(excel_filename, XLSX_OPTIONS)
+        try:
+            for area_name in area_names:
+                self.create_excel_sheet(workbook, area_name, self.load_area_results(area_name))
+        finally:
+            workbook.close()
+
+    def write_combined_json(self, json_filename: str, area_names: List[str]):
+        """Concatenate the per-area JSON files into one object without decoding them"""
+        temp_filename = f"{json_filename}.tmp"
+        with open(temp_filename, 'wb') as out:
+            out.write(b'{')
+            first = True
+            for area_name in area_names:
+                area_filename = self.area_json_filename(area_name)
+                if not os.path.exists(area_filename):
+                    continue
+                if not first:
+                    out.write(b',')
+                first = False
+                out.write(b'\n' + dumps_json(area_name) + b': ')
+                with open(area_filename, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+            out.write(b'\n}')
+        os.replace(temp_filename, json_filename)
 
     def flatten_menu_items(self, menu_items):
         if not isinstance(menu_items, dict):
@@ -705,178 +1117,178 @@ class MainScraper:
                 rows.append(row)
             
             if not rows:
-                print(f"No data to save for {area_name}")
+                logger.info(f"No data to save for {area_name}")
                 return
             
             csv_filename = excel_filename
-            new_df = pd.DataFrame(rows, columns=columns)
-            new_df.to_csv(csv_filename, index=False, encoding='utf-8')
-            print(f"Saved {len(rows)} restaurants to {csv_filename}")
+            with open(csv_filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(rows)
+            logger.info(f"Saved {len(rows)} restaurants to {csv_filename}")
         
         except Exception as e:
-            print(f"Error saving detailed CSV for {area_name}: {str(e)}")
+            logger.info(f"Error saving detailed CSV for {area_name}: {str(e)}")
             logging.error(f"Error saving detailed CSV for {area_name}: {str(e)}")
 
-    @retry(tries=3, delay=2, backoff=2)
+    def schedule_upload(self, file_path):
+        self._upload_tasks.append(asyncio.create_task(self.upload_in_background(file_path)))
+
+    async def upload_in_background(self, file_path) -> bool:
+        uploaded = await asyncio.to_thread(self.upload_to_drive, file_path)
+        if uploaded:
+            logger.info(f"Uploaded {file_path} to Google Drive")
+        else:
+            logger.info(f"Failed to upload {file_path} to Google Drive")
+        return uploaded
+
+    async def wait_for_uploads(self):
+        while self._upload_tasks:
+            tasks, self._upload_tasks = self._upload_tasks, []
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     def upload_to_drive(self, file_path):
-        print(f"\nUploading {file_path} to Google Drive...")
+        logger.info(f"\nUploading {file_path} to Google Drive...")
         try:
             credentials_json = os.environ.get('TALABAT_GCLOUD_KEY_JSON')
             if not credentials_json:
-                print("Error: TALABAT_GCLOUD_KEY_JSON environment variable is empty or not set!")
+                logger.info("Error: TALABAT_GCLOUD_KEY_JSON environment variable is empty or not set!")
                 return False
-            self.drive_uploader = SavingOnDrive(credentials_json=credentials_json)
+            # Reuse the uploader so its credentials and date folder IDs stay cached between uploads
+            if self.drive_uploader.credentials_json != credentials_json:
+                self.drive_uploader = SavingOnDrive(credentials_json=credentials_json)
             if not self.drive_uploader.authenticate():
-                print("Failed to authenticate with Google Drive. Check TALABAT_GCLOUD_KEY_JSON validity.")
+                logger.info("Failed to authenticate with Google Drive. Check TALABAT_GCLOUD_KEY_JSON validity.")
                 return False
             file_ids = self.drive_uploader.upload_to_multiple_folders(file_path)
             success = len(file_ids) == 2
             if success:
-                print(f"Successfully uploaded {file_path} to Google Drive")
+                logger.info(f"Successfully uploaded {file_path} to Google Drive")
             else:
-                print(f"Failed to upload {file_path}: Incomplete upload to folders")
+                logger.info(f"Failed to upload {file_path}: Incomplete upload to folders")
             return success
         except Exception as e:
-            print(f"Error uploading to Google Drive: {str(e)}")
+            logger.info(f"Error uploading to Google Drive: {str(e)}")
             return False
 
     async def run(self):
-        ahmadi_areas = [
-            ("الظهر", "https://www.talabat.com/kuwait/restaurants/59/dhaher"),
-            ("الرقه", "https://www.talabat.com/kuwait/restaurants/37/riqqa"),
-            ("هدية", "https://www.talabat.com/kuwait/restaurants/30/hadiya"),
-            ("المنقف", "https://www.talabat.com/kuwait/restaurants/32/mangaf"),
-            ("أبو حليفة", "https://www.talabat.com/kuwait/restaurants/2/abu-halifa"),
-            ("الفنطاس", "https://www.talabat.com/kuwait/restaurants/38/fintas"),
-            ("العقيلة", "https://www.talabat.com/kuwait/restaurants/79/egaila"),
-            ("الصباحية", "https://www.talabat.com/kuwait/restaurants/31/sabahiya"),
-            ("الأحمدي", "https://www.talabat.com/kuwait/restaurants/3/al-ahmadi"),
-            ("الفحيحيل", "https://www.talabat.com/kuwait/restaurants/5/fahaheel"),
-            ("شرق الأحمدي", "https://www.talabat.com/kuwait/restaurants/3/al-ahmadi"),
-            ("ضاحية علي صباح السالم", "https://www.talabat.com/kuwait/restaurants/82/ali-sabah-al-salem-umm-al-hayman"),
-            ("ميناء عبد الله", "https://www.talabat.com/kuwait/restaurants/100/mina-abdullah"),
-            ("بنيدر", "https://www.talabat.com/kuwait/restaurants/6650/bnaider"),
-            ("الزور", "https://www.talabat.com/kuwait/restaurants/2053/zour"),
-            ("الجليعة", "https://www.talabat.com/kuwait/restaurants/6860/al-julaiaa"),
-            ("المهبولة", "https://www.talabat.com/kuwait/restaurants/24/mahboula"),
-            ("النويصيب", "https://www.talabat.com/kuwait/restaurants/2054/nuwaiseeb"),
-            ("الخيران", "https://www.talabat.com/kuwait/restaurants/2726/khairan"),
-            ("الوفرة", "https://www.talabat.com/kuwait/restaurants/2057/wafra-farms"),
-            ("ضاحية فهد الأحمد", "https://www.talabat.com/kuwait/restaurants/98/fahad-al-ahmed"),
-            ("ضاحية جابر العلي", "https://www.talabat.com/kuwait/restaurants/60/jaber-al-ali"),
-            ("مدينة صباح الأحمد السكنية", "https://www.talabat.com/kuwait/restaurants/6931/sabah-al-ahmad-2"),
-            ("مدينة صباح الأحمد البحرية", "https://www.talabat.com/kuwait/restaurants/2726/khairan"),
-            ("ميناء الأحمدي", "https://www.talabat.com/kuwait/restaurants/3/al-ahmadi")
-        ]
-        
+        try:
+            await self.scrape_all_areas()
+        finally:
+            await self.close_browsers()
+            await self.wait_for_uploads()
+            self._selenium_executor.shutdown(wait=False)
+
+    async def scrape_all_areas(self):
         simplified_excel_filename = os.path.join(self.output_dir, "الاحمدي.xlsx")
-        simplified_workbook = Workbook()
-        if "Sheet" in simplified_workbook.sheetnames:
-            simplified_workbook.remove(simplified_workbook["Sheet"])
+        snapshot_excel_filename = os.path.join(self.output_dir, "الاحمدي_progress.xlsx")
         
         completed_areas = self.current_progress["completed_areas"]
         current_area_index = self.current_progress["current_area_index"]
         
-        print(f"Starting from area index {current_area_index}")
-        print(f"Already completed areas: {', '.join(completed_areas) if completed_areas else 'None'}")
+        logger.info(f"Starting from area index {current_area_index}")
+        logger.info(f"Already completed areas: {', '.join(completed_areas) if completed_areas else 'None'}")
+        
+        # Several areas share a listing URL; only the first of them is scraped
+        first_area_for_url = {}
+        for area_name, area_url in AHMADI_AREAS:
+            first_area_for_url.setdefault(area_url, area_name)
         
         resuming_area = self.current_progress["current_progress"]["area_name"]
         if resuming_area:
-            for idx, (area_name, _) in enumerate(ahmadi_areas):
+            for idx, (area_name, _) in enumerate(AHMADI_AREAS):
                 if area_name == resuming_area:
-                    print(f"Resuming from area {resuming_area} (index {idx})")
+                    logger.info(f"Resuming from area {resuming_area} (index {idx})")
                     current_area_index = idx
                     self.current_progress["current_area_index"] = idx
                     self.scraped_progress["current_area_index"] = idx
-                    self.save_current_progress()
-                    self.save_scraped_progress()
-                    self.commit_progress(f"Resuming from area {resuming_area}")
+                    await self.checkpoint_async(f"Resuming from area {resuming_area}")
                     break
         
-        for idx, (area_name, area_url) in enumerate(ahmadi_areas):
+        for idx, (area_name, area_url) in enumerate(AHMADI_AREAS):
             if area_name in completed_areas and area_name != resuming_area:
-                print(f"Skipping completed area: {area_name}")
+                logger.info(f"Skipping completed area: {area_name}")
                 continue
             if idx < current_area_index:
-                print(f"Skipping area {area_name} (index {idx} < {current_area_index})")
+                logger.info(f"Skipping area {area_name} (index {idx} < {current_area_index})")
                 continue
             
             self.current_progress["current_area_index"] = idx
             self.scraped_progress["current_area_index"] = idx
-            self.save_current_progress()
-            self.save_scraped_progress()
-            self.commit_progress(f"Starting area {area_name} at index {idx}")
+            await self.checkpoint_async(f"Starting area {area_name} at index {idx}")
             
             try:
-                area_results = await self.scrape_and_save_area(area_name, area_url)
-                self.create_excel_sheet(simplified_workbook, area_name, area_results)
-                simplified_workbook.save(simplified_excel_filename)
-                print(f"Updated simplified Excel file: {simplified_excel_filename}")
+                source_area = first_area_for_url[area_url]
+                if source_area != area_name and source_area in completed_areas and os.path.exists(self.area_json_filename(source_area)):
+                    await self.reuse_area_results(area_name, source_area)
+                else:
+                    await self.scrape_and_save_area(area_name, area_url)
                 
                 if area_name not in completed_areas:
                     completed_areas.append(area_name)
                     self.current_progress["completed_areas"] = completed_areas
                     self.scraped_progress["completed_areas"] = completed_areas
-                self.save_current_progress()
-                self.save_scraped_progress()
                 self.print_progress_details()
-                self.commit_progress(f"Completed area {area_name} in run")
-                await asyncio.sleep(5)
+                await self.commit_progress_async(f"Completed area {area_name} in run")
+                
+                if len(completed_areas) % SNAPSHOT_EVERY == 0:
+                    self.write_combined_workbook(snapshot_excel_filename, [name for name, _ in AHMADI_AREAS if name in completed_areas])
+                    logger.info(f"Progress Excel snapshot saved: {snapshot_excel_filename}")
             
             except Exception as e:
-                print(f"Error processing area {area_name}: {e}")
+                logger.info(f"Error processing area {area_name}: {e}")
                 logging.error(f"Error processing area {area_name}: {e}")
-                import traceback
                 traceback.print_exc()
-                self.save_current_progress()
-                self.save_scraped_progress()
-                self.commit_progress(f"Progress update after error in {area_name}")
+                await self.commit_progress_async(f"Progress update after error in {area_name}")
         
-        simplified_workbook.save(simplified_excel_filename)
+        # Completed areas from earlier runs are included too, so a resumed run still produces the full workbook
+        self.write_combined_workbook(simplified_excel_filename, [name for name, _ in AHMADI_AREAS if name in completed_areas])
         combined_json_filename = os.path.join(self.output_dir, "الاحمدي_all.json")
-        with open(combined_json_filename, 'w', encoding='utf-8') as f:
-            json.dump(self.scraped_progress["all_results"], f, indent=2, ensure_ascii=False)
+        # The upload only needs the finished workbook, so it runs alongside the combined JSON write
+        json_task = asyncio.to_thread(self.write_combined_json, combined_json_filename, [name for name, _ in AHMADI_AREAS])
+        all_areas_done = len(completed_areas) == len(AHMADI_AREAS)
+        if all_areas_done:
+            self.schedule_upload(simplified_excel_filename)
+        await json_task
+        await self.wait_for_uploads()
         
-        print(f"\n{'='*50}")
-        print(f"SCRAPING COMPLETED")
-        print(f"Simplified Excel file saved: {simplified_excel_filename}")
-        print(f"Combined JSON saved: {combined_json_filename}")
+        logger.info(f"\n{'='*50}")
+        logger.info(f"SCRAPING COMPLETED")
+        logger.info(f"Simplified Excel file saved: {simplified_excel_filename}")
+        logger.info(f"Combined JSON saved: {combined_json_filename}")
         
-        if len(completed_areas) == len(ahmadi_areas):
-            if self.upload_to_drive(simplified_excel_filename):
-                print(f"Uploaded simplified Excel file to Google Drive")
-            else:
-                print(f"Failed to upload simplified Excel file to Google Drive")
-        else:
-            print(f"Scraping incomplete ({len(completed_areas)}/{len(ahmadi_areas)} areas)")
+        if not all_areas_done:
+            logger.info(f"Scraping incomplete ({len(completed_areas)}/{len(AHMADI_AREAS)} areas)")
         
-        self.commit_progress("Final progress update after run")
+        await self.commit_progress_async("Final progress update after run")
+        await asyncio.to_thread(self.git_gc)
 
 async def main():
     try:
         scraper = MainScraper()
         await scraper.run()
     except KeyboardInterrupt:
-        print("\nInterrupted. Saving progress...")
+        logger.info("\nInterrupted. Saving progress...")
         if 'scraper' in locals():
-            scraper.save_current_progress()
-            scraper.save_scraped_progress()
+            scraper.save_progress(force=True)
             scraper.commit_progress("Progress saved after interruption")
-        print("Progress saved. Exiting.")
+        logger.info("Progress saved. Exiting.")
     except Exception as e:
-        print(f"Critical error: {e}")
-        import traceback
+        logger.info(f"Critical error: {e}")
         traceback.print_exc()
         if 'scraper' in locals():
-            scraper.save_current_progress()
-            scraper.save_scraped_progress()
+            scraper.save_progress(force=True)
             scraper.commit_progress("Progress saved after critical error")
         sys.exit(1)
 
 if __name__ == "__main__":
     scraper = MainScraper()
     scraper.print_progress_details()
-    asyncio.run(scraper.run())
+    # uvloop.run rather than an event loop policy: nest_asyncio replaces asyncio.run with a version that ignores policies
+    if uvloop is not None:
+        uvloop.run(scraper.run())
+    else:
+        asyncio.run(scraper.run())
 
 
 
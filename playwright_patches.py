@@ -0,0 +1,41 @@
+"""Cheaper call-site capture for Playwright.
+
+Playwright records the caller's stack with inspect.stack() on every API call, which resolves
+source files and reads source lines for every frame. It only needs file names, line numbers
+and function names, so its modules get a stack() that builds those straight from the frames.
+Set TALABAT_PLAYWRIGHT_STACKS=1 to keep Playwright's own behaviour.
+"""
+import inspect
+import logging
+import os
+import sys
+import types
+
+
+def light_stack(context=1):
+    """inspect.stack() without source lookups; code_context and index are always None"""
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        frames.append(inspect.FrameInfo(frame, code.co_filename, frame.f_lineno, code.co_name, None, None))
+        frame = frame.f_back
+    return frames
+
+
+def apply():
+    try:
+        from playwright._impl import _connection, _network
+    except ImportError as e:
+        logging.warning(f"Playwright internals not found, leaving inspect.stack alone: {e}")
+        return
+    shim = types.ModuleType("inspect")
+    shim.__dict__.update(vars(inspect))
+    shim.stack = light_stack
+    for module in (_connection, _network):
+        if getattr(module, "inspect", None) is inspect:
+            module.inspect = shim
+
+
+if not os.environ.get('TALABAT_PLAYWRIGHT_STACKS'):
+    apply()
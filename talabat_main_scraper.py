@@ -1,8 +1,9 @@
 import asyncio
 import nest_asyncio
 from playwright.async_api import async_playwright
+import playwright_patches
+from json_utils import write_json_atomic
 from typing import Optional, Dict, List
-import json
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -19,6 +20,9 @@ from selenium.webdriver import Firefox
 # Apply nest_asyncio at the module level
 nest_asyncio.apply()
 
+# Matches the page parameter of an area URL when building the URLs of later pages
+PAGE_PARAM_RE = re.compile(r'page=\d+')
+
 
 class TalabatScraper:
     def __init__(self):
@@ -116,7 +120,7 @@ class TalabatScraper:
                             # Add page parameter to existing query string
                             if "page=" in area_url:
                                 # Replace existing page parameter
-                                current_url = re.sub(r'page=\d+', f'page={page_num}', area_url)
+                                current_url = PAGE_PARAM_RE.sub(f'page={page_num}', area_url)
                             else:
                                 # Add page parameter
                                 current_url = f"{area_url}&page={page_num}"
@@ -193,219 +197,204 @@ class TalabatScraper:
             last_height = new_height
             scroll_attempts += 1
 
-        # Extract restaurants from current page
+        # Extract restaurants from current page; every card is read in one round trip
         print(f"Extracting restaurant data from page {page_num}...")
-        cards = await page.query_selector_all('a[data-testid="restaurant-a"]')
+        cards = await page.evaluate("""() => Array.from(
+            document.querySelectorAll('a[data-testid="restaurant-a"]'),
+            card => {
+                const content = card.querySelector(".content");
+                if (!content) return {missing: "content container"};
+                const nameElem = content.querySelector("h2");
+                if (!nameElem) return {missing: "name element"};
+                const cuisineElem = content.querySelector("div");
+                const ratingElem = content.querySelector('[data-testid="restaurant-rating-comp"]');
+                return {
+                    name: nameElem.innerText,
+                    cuisine: cuisineElem ? cuisineElem.innerText : "Unknown",
+                    href: card.getAttribute("href"),
+                    rating: ratingElem ? ratingElem.innerText : "No rating",
+                    spans: Array.from(content.querySelectorAll("span"), span => span.innerText),
+                    badges: Array.from(content.querySelectorAll(".one-badge"), badge => badge.innerText),
+                };
+            }
+        )""")
         print(f"Found {len(cards)} restaurant cards on page {page_num}")
 
         for index, card in enumerate(cards, 1):
-            try:
-                print(f"Processing restaurant {index}/{len(cards)} on page {page_num}")
-
-                # Get content container
-                content = await card.query_selector(".content")
-                if not content:
-                    print(f"No content container found for restaurant {index}")
-                    continue
-
-                # Extract name
-                name_elem = await content.query_selector("h2")
-                if not name_elem:
-                    print(f"No name element found for restaurant {index}")
-                    continue
-                name = await name_elem.inner_text()
-
-                # Extract cuisine
-                cuisine_elem = await content.query_selector("div")
-                cuisine = await cuisine_elem.inner_text() if cuisine_elem else "Unknown"
-
-                # Get URL
-                href = await card.get_attribute("href")
-                if not href:
-                    print(f"No URL found for restaurant {index}")
-                    continue
-                url = self.BASE_URL + href
-
-                # Extract rating
-                rating_elem = await content.query_selector('[data-testid="restaurant-rating-comp"]')
-                rating = await rating_elem.inner_text() if rating_elem else "No rating"
-
-                restaurant = {
-                    "name": name,
-                    "cuisine": cuisine,
-                    "url": url,
-                    "rating": rating,
-                    "page": page_num  # Track which page this restaurant came from
-                }
-
-                # Extract delivery info
-                spans = await content.query_selector_all("span")
-                if spans:
-                    try:
-                        delivery_time = await spans[0].inner_text() if len(spans) > 0 else "N/A"
-                        delivery_fee = (await spans[1].inner_text()).replace("Delivery:", "").strip() if len(
-                            spans) > 1 else "N/A"
-                        min_order = (await spans[2].inner_text()).replace("Min:", "").strip() if len(
-                            spans) > 2 else "N/A"
-
-                        restaurant.update({
-                            "delivery_time": delivery_time,
-                            "delivery_fee": delivery_fee,
-                            "min_order": min_order
-                        })
-                    except Exception as e:
-                        print(f"Error extracting delivery info for {name}: {e}")
-
-                # Extract badges
-                badges = await content.query_selector_all('.one-badge')
-                if badges:
-                    try:
-                        tracking = await badges[0].inner_text() if len(badges) > 0 else "N/A"
-                        contactless = await badges[1].inner_text() if len(badges) > 1 else "N/A"
-
-                        restaurant.update({
-                            "tracking_status": tracking,
-                            "contactless": contactless
-                        })
-                    except Exception as e:
-                        print(f"Error extracting badges for {name}: {e}")
+            if "missing" in card:
+                print(f"No {card['missing']} found for restaurant {index}")
+                continue
+            if not card["href"]:
+                print(f"No URL found for restaurant {index}")
+                continue
 
-                restaurants.append(restaurant)
-                print(f"Successfully processed {name}")
+            name = card["name"]
+            restaurant = {
+                "name": name,
+                "cuisine": card["cuisine"],
+                "url": self.BASE_URL + card["href"],
+                "rating": card["rating"],
+                "page": page_num  # Track which page this restaurant came from
+            }
 
-            except Exception as e:
-                print(f"Error processing restaurant card {index}: {e}")
-                continue
+            # Delivery info
+            spans = card["spans"]
+            if spans:
+                restaurant.update({
+                    "delivery_time": spans[0],
+                    "delivery_fee": spans[1].replace("Delivery:", "").strip() if len(spans) > 1 else "N/A",
+                    "min_order": spans[2].replace("Min:", "").strip() if len(spans) > 2 else "N/A"
+                })
+
+            # Badges
+            badges = card["badges"]
+            if badges:
+                restaurant.update({
+                    "tracking_status": badges[0],
+                    "contactless": badges[1] if len(badges) > 1 else "N/A"
+                })
+
+            restaurants.append(restaurant)
+            print(f"Successfully processed {name}")
 
         return restaurants
 
     ### RESTAURANTS' INFO ###
-    async def get_restaurant_info(self, restaurant_url: str, max_retries: int = 3) -> Optional[Dict]:
-        """Scrapes detailed information from a specific restaurant page with retry logic."""
+    async def get_restaurant_info(self, restaurant_url: str, max_retries: int = 3, browser=None) -> Optional[Dict]:
+        """Scrapes detailed information from a specific restaurant page with retry logic, reusing `browser` when given."""
         for attempt in range(max_retries):
-            browser = None
             try:
+                if browser is not None:
+                    return await self._scrape_restaurant_info(browser, restaurant_url)
                 async with async_playwright() as p:
-                    browser = await p.chromium.launch(headless=True, args=['--no-sandbox'])
-                    context = await browser.new_context(
-                        viewport={'width': 1920, 'height': 1080},
-                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    )
-
-                    page = await context.new_page()
-                    # Increase timeout for problematic pages
-                    page.set_default_timeout(120000)  # 2 minutes timeout
-
-                    response = await page.goto(restaurant_url)
-                    if response is None or not response.ok:
-                        return None
-
-                    # Wait for network idle with a more lenient timeout
+                    launched_browser = await p.chromium.launch(headless=True, args=['--no-sandbox'])
                     try:
-                        await page.wait_for_load_state('networkidle', timeout=30000)
-                    except Exception as e:
-                        print(f"Network idle timeout, continuing anyway: {str(e)}")
-                        pass
-
-                    # Extract Address
-                    address_xpath = "xpath=/html/body/div/div/div[1]/div/div/div/div[2]/div/div/div/div/div[1]/div[1]/a/h1/small"
-                    address_locator = page.locator(address_xpath)
-                    extracted_data = {}
+                        return await self._scrape_restaurant_info(launched_browser, restaurant_url)
+                    finally:
+                        await launched_browser.close()
 
-                    if await address_locator.is_visible():
-                        extracted_data["Address"] = (await address_locator.inner_text()).replace("\xa0", " ")
+            except Exception as e:
+                if "Timeout" in str(e):
+                    if attempt < max_retries - 1:
+                        print(f"Timeout occurred, attempt {attempt + 1}/{max_retries}. Retrying...")
+                        await asyncio.sleep(5)  # Wait 5 seconds before retrying
+                        continue
                     else:
-                        extracted_data["Address"] = "Not Available"
+                        print(f"Failed after {max_retries} attempts: {str(e)}")
+                else:
+                    print(f"Error scraping restaurant info: {str(e)}")
+                return None
 
-                    # Extract Reviews URL
-                    reviews_url_xpath = "xpath=/html/body/div/div/div[1]/div/div/div/div[2]/div/div/div/div/div[1]/div[1]/a"
-                    reviews_url_locator = page.locator(reviews_url_xpath)
+    async def _scrape_restaurant_info(self, browser, restaurant_url: str) -> Optional[Dict]:
+        """Extracts the info section of a restaurant page in a fresh context of the given browser."""
+        context = None
+        try:
+            context = await browser.new_context(
+                viewport={'width': 1920, 'height': 1080},
+                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            )
 
-                    if await reviews_url_locator.is_visible():
-                        href = await reviews_url_locator.get_attribute("href")
-                        if href:
-                            extracted_data["Reviews URL"] = f"{self.BASE_URL}{href}"
-                        else:
-                            extracted_data["Reviews URL"] = "Not Available"
-                    else:
-                        extracted_data["Reviews URL"] = "Not Available"
+            page = await context.new_page()
+            # Increase timeout for problematic pages
+            page.set_default_timeout(120000)  # 2 minutes timeout
 
-                    # Find and Click Info Button
-                    info_button_css = 'button:has-text("Info")'
-                    info_button = page.locator(info_button_css)
+            response = await page.goto(restaurant_url)
+            if response is None or not response.ok:
+                return None
 
-                    if await info_button.is_visible():
-                        await info_button.click(force=True)
-                        await asyncio.sleep(2)
-                    else:
-                        return None
+            # Wait for network idle with a more lenient timeout
+            try:
+                await page.wait_for_load_state('networkidle', timeout=30000)
+            except Exception as e:
+                print(f"Network idle timeout, continuing anyway: {str(e)}")
+                pass
 
-                    # Scroll to Load Info Section
-                    info_section_css = '.col-md-11'
+            # Extract Address
+            address_xpath = "xpath=/html/body/div/div/div[1]/div/div/div/div[2]/div/div/div/div/div[1]/div[1]/a/h1/small"
+            address_locator = page.locator(address_xpath)
+            extracted_data = {}
 
-                    for _ in range(15):
-                        await page.evaluate("window.scrollBy(0, 600)")
-                        await asyncio.sleep(1)
+            if await address_locator.is_visible():
+                extracted_data["Address"] = (await address_locator.inner_text()).replace("\xa0", " ")
+            else:
+                extracted_data["Address"] = "Not Available"
 
-                        if await page.locator(info_section_css).is_visible():
-                            break
-                    else:
-                        return None
+            # Extract Reviews URL
+            reviews_url_xpath = "xpath=/html/body/div/div/div[1]/div/div/div/div[2]/div/div/div/div/div[1]/div[1]/a"
+            reviews_url_locator = page.locator(reviews_url_xpath)
 
-                    # Extract Additional Info Data
-                    for i in range(1, 10):
-                        label_xpath = f"xpath=/html/body/div/div/div[1]/div/div/div/div[3]/div/div[2]/div[1]/div/div[2]/div[{i}]/div[1]"
-                        value_xpath = f"xpath=/html/body/div/div/div[1]/div/div/div/div[3]/div/div[2]/div[1]/div/div[2]/div[{i}]/div[2]"
+            if await reviews_url_locator.is_visible():
+                href = await reviews_url_locator.get_attribute("href")
+                if href:
+                    extracted_data["Reviews URL"] = f"{self.BASE_URL}{href}"
+                else:
+                    extracted_data["Reviews URL"] = "Not Available"
+            else:
+                extracted_data["Reviews URL"] = "Not Available"
 
-                        label_locator = page.locator(label_xpath)
-                        value_locator = page.locator(value_xpath)
+            # Find and Click Info Button
+            info_button_css = 'button:has-text("Info")'
+            info_button = page.locator(info_button_css)
 
-                        if await label_locator.is_visible():
-                            label_text = await label_locator.inner_text()
+            if await info_button.is_visible():
+                await info_button.click(force=True)
+                await asyncio.sleep(2)
+            else:
+                return None
 
-                            # Skip the Cuisines field since we already have it from the listing
-                            if label_text.strip() == "Cuisines":
-                                continue
+            # Scroll to Load Info Section
+            info_section_css = '.col-md-11'
 
-                            if label_text.strip().lower() == "payment":
-                                payment_methods = []
-                                img_xpath = f"{value_xpath}/div/img"
-                                img_elements = page.locator(img_xpath)
+            for _ in range(15):
+                await page.evaluate("window.scrollBy(0, 600)")
+                await asyncio.sleep(1)
 
-                                count = await img_elements.count()
-                                for j in range(count):
-                                    img_locator = img_elements.nth(j)
-                                    alt_text = await img_locator.get_attribute("alt")
-                                    if alt_text:
-                                        payment_methods.append(alt_text)
+                if await page.locator(info_section_css).is_visible():
+                    break
+            else:
+                return None
 
-                                extracted_data["Payment"] = payment_methods
-                            else:
-                                if await value_locator.is_visible():
-                                    value_text = await value_locator.inner_text()
-                                    extracted_data[label_text] = value_text
-                                else:
-                                    extracted_data[label_text] = ""
-                        else:
-                            break
+            # Extract Additional Info Data
+            for i in range(1, 10):
+                label_xpath = f"xpath=/html/body/div/div/div[1]/div/div/div/div[3]/div/div[2]/div[1]/div/div[2]/div[{i}]/div[1]"
+                value_xpath = f"xpath=/html/body/div/div/div[1]/div/div/div/div[3]/div/div[2]/div[1]/div/div[2]/div[{i}]/div[2]"
 
-                    return extracted_data
+                label_locator = page.locator(label_xpath)
+                value_locator = page.locator(value_xpath)
 
-            except Exception as e:
-                if "Timeout" in str(e):
-                    if attempt < max_retries - 1:
-                        print(f"Timeout occurred, attempt {attempt + 1}/{max_retries}. Retrying...")
-                        await asyncio.sleep(5)  # Wait 5 seconds before retrying
+                if await label_locator.is_visible():
+                    label_text = await label_locator.inner_text()
+
+                    # Skip the Cuisines field since we already have it from the listing
+                    if label_text.strip() == "Cuisines":
                         continue
+
+                    if label_text.strip().lower() == "payment":
+                        payment_methods = []
+                        img_xpath = f"{value_xpath}/div/img"
+                        img_elements = page.locator(img_xpath)
+
+                        count = await img_elements.count()
+                        for j in range(count):
+                            img_locator = img_elements.nth(j)
+                            alt_text = await img_locator.get_attribute("alt")
+                            if alt_text:
+                                payment_methods.append(alt_text)
+
+                        extracted_data["Payment"] = payment_methods
                     else:
-                        print(f"Failed after {max_retries} attempts: {str(e)}")
+                        if await value_locator.is_visible():
+                            value_text = await value_locator.inner_text()
+                            extracted_data[label_text] = value_text
+                        else:
+                            extracted_data[label_text] = ""
                 else:
-                    print(f"Error scraping restaurant info: {str(e)}")
-                return None
+                    break
 
-            finally:
-                if browser:
-                    await browser.close()
+            return extracted_data
+        finally:
+            if context:
+                await context.close()
 
     ### RESTAURANTS' REVIEWS ###
     def get_reviews_data(self, reviews_url: str) -> Optional[Dict]:
@@ -423,6 +412,8 @@ class TalabatScraper:
 
             # Initialize Firefox WebDriver
             driver = webdriver.Firefox(options=firefox_options)
+            # Selenium waits up to 300s for a load by default; this runs in a worker thread, so bound it here
+            driver.set_page_load_timeout(60)
             driver.get(reviews_url)  # Using the passed parameter
 
             # Set explicit wait
@@ -1786,7 +1777,7 @@ class TalabatScraper:
     #         return {}
 
     async def get_restaurant_menu(self, url):
-        """Menu scraping without timeouts"""
+        """Menu scraping; a page load is bounded, the scrape as a whole is up to the caller"""
         driver = None
         try:
             options = FirefoxOptions()
@@ -1796,8 +1787,6 @@ class TalabatScraper:
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
     
-            # Disable all timeouts
-            options.set_preference("page.load.timeout", 0)
             options.set_preference("browser.cache.disk.enable", False)
             options.set_preference("browser.cache.memory.enable", False)
             options.set_preference("browser.cache.offline.enable", False)
@@ -1807,7 +1796,8 @@ class TalabatScraper:
             for attempt in range(max_retries):
                 try:
                     driver = webdriver.Firefox(options=options)
-                    driver.set_page_load_timeout(999999)  # Effectively disable timeout
+                    # A hung load would otherwise block until Selenium's 300s default gives up
+                    driver.set_page_load_timeout(60)
     
                     print(f"Loading page (attempt {attempt + 1})...")
                     driver.get(url)
@@ -1892,6 +1882,24 @@ class TalabatScraper:
             print(f"Critical error in get_restaurant_menu: {e}")
             return {}
 
+    def get_restaurant_menu_sync(self, url, timeout=None):
+        """Run get_restaurant_menu to completion on an event loop of its own, for use from a worker thread.
+
+        The menu scrape drives Selenium synchronously between its awaits, so it must not share the
+        caller's loop. `timeout` cancels it at its next await, which also quits its driver.
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(asyncio.wait_for(self.get_restaurant_menu(url), timeout))
+        finally:
+            # Like asyncio.run: tasks the timeout cut off are cancelled and awaited, so their browsers close
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
     ### COMBINING THE METHODS AND SCRAPING ALL RESTAURANTS FOR EACH PAGE ###
     async def scrape_all_restaurants_by_page(self, area_url: str, start_page: int = 7, start_restaurant: int = 4) -> List[Dict]:
         """Scrapes listing, info, reviews, and menu for all restaurants page by page."""
@@ -1970,7 +1978,7 @@ class TalabatScraper:
                     # Add page parameter to existing query string
                     if "page=" in area_url:
                         # Replace existing page parameter
-                        current_url = re.sub(r'page=\d+', f'page={page_num}', area_url)
+                        current_url = PAGE_PARAM_RE.sub(f'page={page_num}', area_url)
                     else:
                         # Add page parameter
                         current_url = f"{area_url}&page={page_num}"
@@ -1989,11 +1997,8 @@ class TalabatScraper:
     
             # Save progress after each page
             try:
-                with open(f'talabat_restaurants_page_{page_num}.json', 'w', encoding='utf-8') as f:
-                    json.dump(page_restaurants, f, indent=2, ensure_ascii=False)
-    
-                with open('talabat_restaurants_progress.json', 'w', encoding='utf-8') as f:
-                    json.dump(full_data, f, indent=2, ensure_ascii=False)
+                write_json_atomic(f'talabat_restaurants_page_{page_num}.json', page_restaurants)
+                write_json_atomic('talabat_restaurants_progress.json', full_data)
     
                 print(f"Saved progress for page {page_num}")
             except Exception as e: